@@ -0,0 +1,75 @@
+"""add sync tombstones and updated_at indexes
+
+Revision ID: 0b72de95c5b7
+Revises: 37f072adbb41
+Create Date: 2025-06-06 15:51:02.338716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b72de95c5b7'
+down_revision = '37f072adbb41'
+branch_labels = None
+depends_on = None
+
+SYNC_TABLES = ['categories', 'items', 'locations', 'stocks']
+
+
+def upgrade() -> None:
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sync_tombstones_deleted_at'), 'sync_tombstones', ['deleted_at'], unique=False)
+    op.create_index(op.f('ix_categories_updated_at'), 'categories', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_items_updated_at'), 'items', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_locations_updated_at'), 'locations', ['updated_at'], unique=False)
+
+    # 削除された行を記録する
+    op.execute("""
+        CREATE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # ORMを経由しない更新でも updated_at が必ず進むようにする
+    op.execute("""
+        CREATE FUNCTION touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in SYNC_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_sync_tombstone
+            AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_touch_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_updated_at()
+        """)
+
+
+def downgrade() -> None:
+    for table in SYNC_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_touch_updated_at ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_sync_tombstone ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS touch_updated_at()")
+    op.execute("DROP FUNCTION IF EXISTS record_sync_tombstone()")
+    op.drop_index(op.f('ix_locations_updated_at'), table_name='locations')
+    op.drop_index(op.f('ix_items_updated_at'), table_name='items')
+    op.drop_index(op.f('ix_categories_updated_at'), table_name='categories')
+    op.drop_index(op.f('ix_sync_tombstones_deleted_at'), table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,89 @@
+"""add item_stock_totals
+
+Revision ID: 2b28312be88f
+Revises: 74b2e6f312e3
+Create Date: 2025-05-23 16:48:51.730022
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b28312be88f'
+down_revision = '74b2e6f312e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('item_stock_totals',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('min_threshold', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['items.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('item_id')
+    )
+    op.create_index('ix_item_stock_totals_low', 'item_stock_totals', ['item_id'], unique=False, postgresql_where=sa.text('total < min_threshold'))
+
+    # 既存データから集計を作成する
+    op.execute("""
+        INSERT INTO item_stock_totals (item_id, total, min_threshold)
+        SELECT i.id, coalesce(sum(s.quantity), 0), i.min_threshold
+        FROM items i
+        LEFT JOIN stocks s ON s.item_id = i.id
+        GROUP BY i.id
+    """)
+
+    # stocks の変更を差分として集計に反映する
+    op.execute("""
+        CREATE FUNCTION apply_item_stock_total_delta() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE item_stock_totals
+                SET total = total - OLD.quantity, updated_at = now()
+                WHERE item_id = OLD.item_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO item_stock_totals (item_id, total, min_threshold)
+                SELECT NEW.item_id, NEW.quantity, i.min_threshold FROM items i WHERE i.id = NEW.item_id
+                ON CONFLICT (item_id) DO UPDATE
+                SET total = item_stock_totals.total + excluded.total, updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_item_stock_totals
+        AFTER INSERT OR DELETE OR UPDATE OF item_id, quantity ON stocks
+        FOR EACH ROW EXECUTE FUNCTION apply_item_stock_total_delta()
+    """)
+
+    # items の追加・閾値変更を集計に反映する
+    op.execute("""
+        CREATE FUNCTION sync_item_stock_total_threshold() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO item_stock_totals (item_id, total, min_threshold)
+            VALUES (NEW.id, 0, NEW.min_threshold)
+            ON CONFLICT (item_id) DO UPDATE
+            SET min_threshold = excluded.min_threshold, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_items_item_stock_totals
+        AFTER INSERT OR UPDATE OF min_threshold ON items
+        FOR EACH ROW EXECUTE FUNCTION sync_item_stock_total_threshold()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_items_item_stock_totals ON items")
+    op.execute("DROP FUNCTION IF EXISTS sync_item_stock_total_threshold()")
+    op.execute("DROP TRIGGER IF EXISTS trg_stocks_item_stock_totals ON stocks")
+    op.execute("DROP FUNCTION IF EXISTS apply_item_stock_total_delta()")
+    op.drop_index('ix_item_stock_totals_low', table_name='item_stock_totals')
+    op.drop_table('item_stock_totals')
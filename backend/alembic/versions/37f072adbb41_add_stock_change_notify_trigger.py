@@ -0,0 +1,58 @@
+"""add stock change notify trigger
+
+Revision ID: 37f072adbb41
+Revises: 68c0fe5309d6
+Create Date: 2025-06-03 13:26:19.447581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '37f072adbb41'
+down_revision = '68c0fe5309d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # stocks の変更を NOTIFY stock_changes で通知する（通知はコミット時に送られる）
+    # 一括インポートでは行ごとに通知せず、同一内容の通知がまとめられる性質を使って1件の BULK にする
+    op.execute("""
+        CREATE FUNCTION notify_stock_change() RETURNS trigger AS $$
+        DECLARE
+            row_data stocks;
+        BEGIN
+            IF current_setting('app.stock_movement_reason', true) = 'import' THEN
+                PERFORM pg_notify('stock_changes', '{"op":"BULK"}');
+                RETURN NULL;
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                row_data := OLD;
+            ELSE
+                row_data := NEW;
+            END IF;
+            PERFORM pg_notify('stock_changes', json_build_object(
+                'op', TG_OP,
+                'id', row_data.id,
+                'item_id', row_data.item_id,
+                'location_id', row_data.location_id,
+                'category_id', (SELECT category_id FROM items WHERE id = row_data.item_id),
+                'quantity', CASE WHEN TG_OP = 'DELETE' THEN 0 ELSE row_data.quantity END,
+                'version', row_data.version
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_notify
+        AFTER INSERT OR DELETE OR UPDATE ON stocks
+        FOR EACH ROW EXECUTE FUNCTION notify_stock_change()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_stocks_notify ON stocks")
+    op.execute("DROP FUNCTION IF EXISTS notify_stock_change()")
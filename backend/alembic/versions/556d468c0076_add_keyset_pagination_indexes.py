@@ -0,0 +1,30 @@
+"""add keyset pagination indexes
+
+Revision ID: 556d468c0076
+Revises: 2372f3db5050
+Create Date: 2025-05-12 10:21:43.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '556d468c0076'
+down_revision = '2372f3db5050'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # stocks.updated_at をソートキーに使うため NULL を埋めてから NOT NULL にする
+    op.execute("UPDATE stocks SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL")
+    op.alter_column('stocks', 'updated_at', existing_type=sa.DateTime(timezone=True), nullable=False, existing_server_default=sa.text('now()'))
+    op.create_index('ix_items_name_id', 'items', [sa.text("coalesce(name, '')"), 'id'], unique=False)
+    op.create_index('ix_stocks_updated_at_id', 'stocks', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stocks_updated_at_id', table_name='stocks')
+    op.drop_index('ix_items_name_id', table_name='items')
+    op.alter_column('stocks', 'updated_at', existing_type=sa.DateTime(timezone=True), nullable=True, existing_server_default=sa.text('now()'))
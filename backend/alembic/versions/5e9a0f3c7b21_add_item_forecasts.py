@@ -0,0 +1,39 @@
+"""add item forecasts
+
+Revision ID: 5e9a0f3c7b21
+Revises: c41d8a2e9f10
+Create Date: 2025-06-12 09:40:17.552810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9a0f3c7b21'
+down_revision = 'c41d8a2e9f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('item_forecasts',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('daily_rate', sa.Float(), nullable=False),
+    sa.Column('current_total', sa.Integer(), nullable=False),
+    sa.Column('min_threshold', sa.Integer(), nullable=False),
+    sa.Column('days_to_threshold', sa.Float(), nullable=True),
+    sa.Column('days_to_depletion', sa.Float(), nullable=True),
+    sa.Column('depletes_on', sa.Date(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['items.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('item_id')
+    )
+    op.create_index('ix_item_forecasts_days_to_depletion', 'item_forecasts', ['days_to_depletion', 'item_id'], unique=False)
+    op.create_index('ix_item_forecasts_days_to_threshold', 'item_forecasts', ['days_to_threshold', 'item_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_forecasts_days_to_threshold', table_name='item_forecasts')
+    op.drop_index('ix_item_forecasts_days_to_depletion', table_name='item_forecasts')
+    op.drop_table('item_forecasts')
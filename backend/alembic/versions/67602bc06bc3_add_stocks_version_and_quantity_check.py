@@ -0,0 +1,27 @@
+"""add stocks version and quantity check
+
+Revision ID: 67602bc06bc3
+Revises: ff7d069129a8
+Create Date: 2025-05-16 14:05:32.871440
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '67602bc06bc3'
+down_revision = 'ff7d069129a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('stocks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.execute("UPDATE stocks SET quantity = 0 WHERE quantity < 0")
+    op.create_check_constraint('ck_stocks_quantity_non_negative', 'stocks', 'quantity >= 0')
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_stocks_quantity_non_negative', 'stocks', type_='check')
+    op.drop_column('stocks', 'version')
@@ -0,0 +1,112 @@
+"""add stock_movements ledger and stock_snapshots
+
+Revision ID: 68c0fe5309d6
+Revises: 2b28312be88f
+Create Date: 2025-05-27 10:12:44.905117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '68c0fe5309d6'
+down_revision = '2b28312be88f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_movements',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('quantity_after', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_stock_movements_item_id_created_at', 'stock_movements', ['item_id', 'created_at'], unique=False)
+    op.create_table('stock_snapshots',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stock_snapshots_taken_at'), 'stock_snapshots', ['taken_at'], unique=False)
+    op.create_index('ix_stock_snapshots_item_id_taken_at', 'stock_snapshots', ['item_id', 'taken_at'], unique=False)
+
+    # 当月から months_ahead か月先までの月別パーティションを作成する（集約ジョブからも呼ばれる）
+    op.execute("""
+        CREATE FUNCTION ensure_stock_movement_partitions(months_ahead integer DEFAULT 2) RETURNS void AS $$
+        DECLARE
+            month_start date := date_trunc('month', now())::date;
+            partition_start date;
+        BEGIN
+            FOR i IN 0..months_ahead LOOP
+                partition_start := (month_start + make_interval(months => i))::date;
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF stock_movements FOR VALUES FROM (%L) TO (%L)',
+                    'stock_movements_' || to_char(partition_start, 'YYYYMM'),
+                    partition_start,
+                    (partition_start + interval '1 month')::date
+                );
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("SELECT ensure_stock_movement_partitions(2)")
+    op.execute("CREATE TABLE stock_movements_default PARTITION OF stock_movements DEFAULT")
+
+    # 現在の在庫数を起点のスナップショットにする
+    op.execute("""
+        INSERT INTO stock_snapshots (taken_at, item_id, location_id, quantity)
+        SELECT now(), item_id, location_id, quantity FROM stocks WHERE quantity <> 0
+    """)
+
+    # stocks の変更をすべて履歴に追記する
+    # 理由はアプリ側が set_config('app.stock_movement_reason', ..., true) で渡す
+    op.execute("""
+        CREATE FUNCTION record_stock_movement() RETURNS trigger AS $$
+        DECLARE
+            movement_reason text := coalesce(nullif(current_setting('app.stock_movement_reason', true), ''), lower(TG_OP));
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (NEW.item_id, NEW.location_id, NEW.quantity, NEW.quantity, movement_reason);
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (OLD.item_id, OLD.location_id, -OLD.quantity, 0, movement_reason);
+            ELSIF NEW.item_id <> OLD.item_id OR NEW.location_id IS DISTINCT FROM OLD.location_id THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (OLD.item_id, OLD.location_id, -OLD.quantity, 0, movement_reason),
+                       (NEW.item_id, NEW.location_id, NEW.quantity, NEW.quantity, movement_reason);
+            ELSIF NEW.quantity <> OLD.quantity THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (NEW.item_id, NEW.location_id, NEW.quantity - OLD.quantity, NEW.quantity, movement_reason);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_stock_movements
+        AFTER INSERT OR DELETE OR UPDATE OF item_id, location_id, quantity ON stocks
+        FOR EACH ROW EXECUTE FUNCTION record_stock_movement()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_stocks_stock_movements ON stocks")
+    op.execute("DROP FUNCTION IF EXISTS record_stock_movement()")
+    op.execute("DROP FUNCTION IF EXISTS ensure_stock_movement_partitions(integer)")
+    op.drop_index('ix_stock_snapshots_item_id_taken_at', table_name='stock_snapshots')
+    op.drop_index(op.f('ix_stock_snapshots_taken_at'), table_name='stock_snapshots')
+    op.drop_table('stock_snapshots')
+    op.drop_index('ix_stock_movements_item_id_created_at', table_name='stock_movements')
+    # パーティションは親テーブルと一緒に削除される
+    op.drop_table('stock_movements')
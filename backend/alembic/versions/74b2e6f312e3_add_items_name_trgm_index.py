@@ -0,0 +1,25 @@
+"""add items name trgm index
+
+Revision ID: 74b2e6f312e3
+Revises: 67602bc06bc3
+Create Date: 2025-05-20 11:37:08.264915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '74b2e6f312e3'
+down_revision = '67602bc06bc3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_items_name_trgm', 'items', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_name_trgm', table_name='items')
@@ -0,0 +1,485 @@
+"""add households and hash-partition items and stocks by household
+
+Revision ID: 8d3f1b6a4e52
+Revises: 5e9a0f3c7b21
+Create Date: 2025-06-18 11:02:36.184907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3f1b6a4e52'
+down_revision = '5e9a0f3c7b21'
+branch_labels = None
+depends_on = None
+
+# 既存のデータはすべてこの世帯に移す
+DEFAULT_HOUSEHOLD_ID = 1
+# items / stocks のハッシュパーティション数（後から変える場合はテーブルの作り直しが必要）
+PARTITIONS = 8
+
+# household_id を追加するだけのテーブル（items / stocks は作り直す）
+SCOPED_TABLES = [
+    'categories', 'locations', 'item_stock_totals', 'item_forecasts',
+    'stock_movements', 'stock_snapshots', 'sync_tombstones',
+]
+
+
+def _create_partitions(table: str) -> None:
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def upgrade() -> None:
+    op.create_table('households',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f"INSERT INTO households (id, name) VALUES ({DEFAULT_HOUSEHOLD_ID}, 'default')")
+    op.execute("SELECT setval(pg_get_serial_sequence('households', 'id'), (SELECT max(id) FROM households))")
+
+    # 既定値付きの列追加はテーブルを書き換えないため、既存行に世帯を入れてから既定値を外す
+    for table in SCOPED_TABLES:
+        op.add_column(table, sa.Column('household_id', sa.Integer(), server_default=str(DEFAULT_HOUSEHOLD_ID), nullable=False))
+        op.alter_column(table, 'household_id', server_default=None)
+        op.create_foreign_key(f'{table}_household_id_fkey', table, 'households', ['household_id'], ['id'])
+
+    # 名前の一意性を世帯ごとにする。(household_id, id) は複合外部キーの参照先
+    op.drop_constraint('categories_name_key', 'categories', type_='unique')
+    op.create_unique_constraint('uq_categories_household_id_name', 'categories', ['household_id', 'name'])
+    op.create_unique_constraint('uq_categories_household_id_id', 'categories', ['household_id', 'id'])
+    op.drop_index('ix_locations_name', table_name='locations')
+    op.create_unique_constraint('uq_locations_household_id_name', 'locations', ['household_id', 'name'])
+    op.create_unique_constraint('uq_locations_household_id_id', 'locations', ['household_id', 'id'])
+
+    # items / stocks を世帯IDのハッシュパーティションで作り直す
+    # インデックスと制約はデータを移してから作る（行ごとに索引を更新しないため）
+    op.execute("""
+        CREATE TABLE items_partitioned (
+            household_id integer NOT NULL,
+            id integer NOT NULL DEFAULT nextval('items_id_seq'),
+            barcode varchar(13),
+            name varchar(100),
+            category_id integer,
+            min_threshold integer NOT NULL,
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz DEFAULT now()
+        ) PARTITION BY HASH (household_id)
+    """)
+    _create_partitions('items_partitioned')
+    op.execute(f"""
+        INSERT INTO items_partitioned (household_id, id, barcode, name, category_id, min_threshold, created_at, updated_at)
+        SELECT {DEFAULT_HOUSEHOLD_ID}, id, barcode, name, category_id, min_threshold, created_at, updated_at FROM items
+    """)
+    op.execute("""
+        CREATE TABLE stocks_partitioned (
+            household_id integer NOT NULL,
+            id integer NOT NULL DEFAULT nextval('stocks_id_seq'),
+            item_id integer NOT NULL,
+            location_id integer,
+            quantity integer NOT NULL,
+            version integer NOT NULL DEFAULT 1,
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY HASH (household_id)
+    """)
+    _create_partitions('stocks_partitioned')
+    op.execute(f"""
+        INSERT INTO stocks_partitioned (household_id, id, item_id, location_id, quantity, version, created_at, updated_at)
+        SELECT {DEFAULT_HOUSEHOLD_ID}, id, item_id, location_id, quantity, version, created_at, updated_at FROM stocks
+    """)
+
+    # シーケンスは旧テーブルと一緒に削除されないよう所有を外してから付け替える
+    # 旧テーブルのトリガーと、旧テーブルを参照する外部キーも一緒に削除される
+    for table in ('items', 'stocks'):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE stocks CASCADE")
+    op.execute("DROP TABLE items CASCADE")
+    for table in ('items', 'stocks'):
+        op.execute(f"ALTER TABLE {table}_partitioned RENAME TO {table}")
+        for remainder in range(PARTITIONS):
+            op.execute(f"ALTER TABLE {table}_partitioned_p{remainder} RENAME TO {table}_p{remainder}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    # パーティションキーを含まない一意制約は作れないため、主キー・一意制約はすべて世帯IDを先頭にする
+    op.create_primary_key('items_pkey', 'items', ['household_id', 'id'])
+    op.create_unique_constraint('uq_items_household_id_barcode', 'items', ['household_id', 'barcode'])
+    op.create_index(op.f('ix_items_name'), 'items', ['name'], unique=False)
+    op.create_index('ix_items_name_id', 'items', ['household_id', sa.text("coalesce(name, '')"), 'id'], unique=False)
+    op.create_index('ix_items_name_trgm', 'items', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_items_updated_at', 'items', ['household_id', 'updated_at'], unique=False)
+    op.create_foreign_key('items_household_id_fkey', 'items', 'households', ['household_id'], ['id'])
+    op.create_foreign_key('items_household_id_category_id_fkey', 'items', 'categories', ['household_id', 'category_id'], ['household_id', 'id'])
+
+    op.create_primary_key('stocks_pkey', 'stocks', ['household_id', 'id'])
+    op.create_unique_constraint('uq_stocks_household_id_item_id_location_id', 'stocks', ['household_id', 'item_id', 'location_id'])
+    op.create_index('ix_stocks_updated_at_id', 'stocks', ['household_id', 'updated_at', 'id'], unique=False)
+    op.create_check_constraint('ck_stocks_quantity_non_negative', 'stocks', 'quantity >= 0')
+    op.create_foreign_key('stocks_household_id_fkey', 'stocks', 'households', ['household_id'], ['id'])
+    op.create_foreign_key('stocks_household_id_item_id_fkey', 'stocks', 'items', ['household_id', 'item_id'], ['household_id', 'id'])
+    op.create_foreign_key('stocks_household_id_location_id_fkey', 'stocks', 'locations', ['household_id', 'location_id'], ['household_id', 'id'])
+
+    for table in ('item_stock_totals', 'item_forecasts'):
+        op.create_foreign_key(
+            f'{table}_household_id_item_id_fkey', table, 'items',
+            ['household_id', 'item_id'], ['household_id', 'id'], ondelete='CASCADE',
+        )
+
+    # トリガー関数が世帯IDを引き継ぐようにする
+    op.execute("""
+        CREATE OR REPLACE FUNCTION apply_item_stock_total_delta() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE item_stock_totals
+                SET total = total - OLD.quantity, updated_at = now()
+                WHERE item_id = OLD.item_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO item_stock_totals (household_id, item_id, total, min_threshold)
+                SELECT NEW.household_id, NEW.item_id, NEW.quantity, i.min_threshold
+                FROM items i WHERE i.household_id = NEW.household_id AND i.id = NEW.item_id
+                ON CONFLICT (item_id) DO UPDATE
+                SET total = item_stock_totals.total + excluded.total, updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_item_stock_total_threshold() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO item_stock_totals (household_id, item_id, total, min_threshold)
+            VALUES (NEW.household_id, NEW.id, 0, NEW.min_threshold)
+            ON CONFLICT (item_id) DO UPDATE
+            SET min_threshold = excluded.min_threshold, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # 購読者は自分の世帯の通知だけを受け取る（BULK も世帯ごとに1件にまとめられる）
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_stock_change() RETURNS trigger AS $$
+        DECLARE
+            row_data stocks;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_data := OLD;
+            ELSE
+                row_data := NEW;
+            END IF;
+            IF current_setting('app.stock_movement_reason', true) = 'import' THEN
+                PERFORM pg_notify('stock_changes', json_build_object(
+                    'op', 'BULK',
+                    'household_id', row_data.household_id
+                )::text);
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify('stock_changes', json_build_object(
+                'op', TG_OP,
+                'household_id', row_data.household_id,
+                'id', row_data.id,
+                'item_id', row_data.item_id,
+                'location_id', row_data.location_id,
+                'category_id', (
+                    SELECT category_id FROM items
+                    WHERE household_id = row_data.household_id AND id = row_data.item_id
+                ),
+                'quantity', CASE WHEN TG_OP = 'DELETE' THEN 0 ELSE row_data.quantity END,
+                'version', row_data.version
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_stock_movement() RETURNS trigger AS $$
+        DECLARE
+            movement_reason text := coalesce(nullif(current_setting('app.stock_movement_reason', true), ''), lower(TG_OP));
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO stock_movements (household_id, item_id, location_id, delta, quantity_after, reason)
+                VALUES (NEW.household_id, NEW.item_id, NEW.location_id, NEW.quantity, NEW.quantity, movement_reason);
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO stock_movements (household_id, item_id, location_id, delta, quantity_after, reason)
+                VALUES (OLD.household_id, OLD.item_id, OLD.location_id, -OLD.quantity, 0, movement_reason);
+            ELSIF NEW.item_id <> OLD.item_id OR NEW.location_id IS DISTINCT FROM OLD.location_id THEN
+                INSERT INTO stock_movements (household_id, item_id, location_id, delta, quantity_after, reason)
+                VALUES (OLD.household_id, OLD.item_id, OLD.location_id, -OLD.quantity, 0, movement_reason),
+                       (NEW.household_id, NEW.item_id, NEW.location_id, NEW.quantity, NEW.quantity, movement_reason);
+            ELSIF NEW.quantity <> OLD.quantity THEN
+                INSERT INTO stock_movements (household_id, item_id, location_id, delta, quantity_after, reason)
+                VALUES (NEW.household_id, NEW.item_id, NEW.location_id, NEW.quantity - OLD.quantity, NEW.quantity, movement_reason);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (household_id, table_name, row_id) VALUES (OLD.household_id, TG_TABLE_NAME, OLD.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # 旧テーブルと一緒に削除されたトリガーを作り直す（パーティションにも引き継がれる）
+    op.execute("""
+        CREATE TRIGGER trg_items_item_stock_totals
+        AFTER INSERT OR UPDATE OF min_threshold ON items
+        FOR EACH ROW EXECUTE FUNCTION sync_item_stock_total_threshold()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_item_stock_totals
+        AFTER INSERT OR DELETE OR UPDATE OF item_id, quantity ON stocks
+        FOR EACH ROW EXECUTE FUNCTION apply_item_stock_total_delta()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_stock_movements
+        AFTER INSERT OR DELETE OR UPDATE OF item_id, location_id, quantity ON stocks
+        FOR EACH ROW EXECUTE FUNCTION record_stock_movement()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_notify
+        AFTER INSERT OR DELETE OR UPDATE ON stocks
+        FOR EACH ROW EXECUTE FUNCTION notify_stock_change()
+    """)
+    for table in ('items', 'stocks'):
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_sync_tombstone
+            AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_touch_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_updated_at()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_bump_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """)
+
+    for table in ('items', 'stocks'):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    # 世帯をまたいで一意だった制約（カテゴリ名・バーコードなど）に戻すため、世帯が1つのときだけ戻せる
+    households = op.get_bind().execute(sa.text("SELECT count(*) FROM households")).scalar_one()
+    if households > 1:
+        raise RuntimeError(
+            f"8d3f1b6a4e52 (households) cannot be downgraded while {households} households exist; "
+            "delete all but one household first or restore from a backup"
+        )
+
+    # items / stocks を分割しないテーブルに作り直す
+    op.execute("""
+        CREATE TABLE items_unpartitioned (
+            id integer NOT NULL DEFAULT nextval('items_id_seq'),
+            barcode varchar(13),
+            name varchar(100),
+            category_id integer,
+            min_threshold integer NOT NULL,
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz DEFAULT now()
+        )
+    """)
+    op.execute("""
+        INSERT INTO items_unpartitioned (id, barcode, name, category_id, min_threshold, created_at, updated_at)
+        SELECT id, barcode, name, category_id, min_threshold, created_at, updated_at FROM items
+    """)
+    op.execute("""
+        CREATE TABLE stocks_unpartitioned (
+            id integer NOT NULL DEFAULT nextval('stocks_id_seq'),
+            item_id integer NOT NULL,
+            location_id integer,
+            quantity integer NOT NULL,
+            version integer NOT NULL DEFAULT 1,
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute("""
+        INSERT INTO stocks_unpartitioned (id, item_id, location_id, quantity, version, created_at, updated_at)
+        SELECT id, item_id, location_id, quantity, version, created_at, updated_at FROM stocks
+    """)
+
+    for table in ('items', 'stocks'):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE stocks CASCADE")
+    op.execute("DROP TABLE items CASCADE")
+    for table in ('items', 'stocks'):
+        op.execute(f"ALTER TABLE {table}_unpartitioned RENAME TO {table}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    op.create_primary_key('items_pkey', 'items', ['id'])
+    op.create_unique_constraint('items_barcode_key', 'items', ['barcode'])
+    op.create_index(op.f('ix_items_id'), 'items', ['id'], unique=False)
+    op.create_index(op.f('ix_items_name'), 'items', ['name'], unique=False)
+    op.create_index('ix_items_name_id', 'items', [sa.text("coalesce(name, '')"), 'id'], unique=False)
+    op.create_index('ix_items_name_trgm', 'items', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_items_updated_at'), 'items', ['updated_at'], unique=False)
+
+    op.create_primary_key('stocks_pkey', 'stocks', ['id'])
+    op.create_index(op.f('ix_stocks_id'), 'stocks', ['id'], unique=False)
+    op.create_unique_constraint('uq_stocks_item_id_location_id', 'stocks', ['item_id', 'location_id'])
+    op.create_index('ix_stocks_updated_at_id', 'stocks', ['updated_at', 'id'], unique=False)
+    op.create_check_constraint('ck_stocks_quantity_non_negative', 'stocks', 'quantity >= 0')
+
+    # 名前の一意性を全体に戻す（複合外部キーの参照先は items / stocks と一緒に外れている）
+    op.drop_constraint('uq_categories_household_id_id', 'categories', type_='unique')
+    op.drop_constraint('uq_categories_household_id_name', 'categories', type_='unique')
+    op.create_unique_constraint('categories_name_key', 'categories', ['name'])
+    op.drop_constraint('uq_locations_household_id_id', 'locations', type_='unique')
+    op.drop_constraint('uq_locations_household_id_name', 'locations', type_='unique')
+    op.create_index(op.f('ix_locations_name'), 'locations', ['name'], unique=True)
+
+    op.create_foreign_key('items_category_id_fkey', 'items', 'categories', ['category_id'], ['id'])
+    op.create_foreign_key('stocks_item_id_fkey', 'stocks', 'items', ['item_id'], ['id'])
+    op.create_foreign_key('stocks_location_id_fkey', 'stocks', 'locations', ['location_id'], ['id'])
+    for table in ('item_stock_totals', 'item_forecasts'):
+        op.create_foreign_key(f'{table}_item_id_fkey', table, 'items', ['item_id'], ['id'], ondelete='CASCADE')
+
+    for table in SCOPED_TABLES:
+        op.drop_constraint(f'{table}_household_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'household_id')
+    op.drop_table('households')
+
+    # トリガー関数を世帯IDの無い形に戻す
+    op.execute("""
+        CREATE OR REPLACE FUNCTION apply_item_stock_total_delta() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE item_stock_totals
+                SET total = total - OLD.quantity, updated_at = now()
+                WHERE item_id = OLD.item_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO item_stock_totals (item_id, total, min_threshold)
+                SELECT NEW.item_id, NEW.quantity, i.min_threshold FROM items i WHERE i.id = NEW.item_id
+                ON CONFLICT (item_id) DO UPDATE
+                SET total = item_stock_totals.total + excluded.total, updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_item_stock_total_threshold() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO item_stock_totals (item_id, total, min_threshold)
+            VALUES (NEW.id, 0, NEW.min_threshold)
+            ON CONFLICT (item_id) DO UPDATE
+            SET min_threshold = excluded.min_threshold, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_stock_change() RETURNS trigger AS $$
+        DECLARE
+            row_data stocks;
+        BEGIN
+            IF current_setting('app.stock_movement_reason', true) = 'import' THEN
+                PERFORM pg_notify('stock_changes', '{"op":"BULK"}');
+                RETURN NULL;
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                row_data := OLD;
+            ELSE
+                row_data := NEW;
+            END IF;
+            PERFORM pg_notify('stock_changes', json_build_object(
+                'op', TG_OP,
+                'id', row_data.id,
+                'item_id', row_data.item_id,
+                'location_id', row_data.location_id,
+                'category_id', (SELECT category_id FROM items WHERE id = row_data.item_id),
+                'quantity', CASE WHEN TG_OP = 'DELETE' THEN 0 ELSE row_data.quantity END,
+                'version', row_data.version
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_stock_movement() RETURNS trigger AS $$
+        DECLARE
+            movement_reason text := coalesce(nullif(current_setting('app.stock_movement_reason', true), ''), lower(TG_OP));
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (NEW.item_id, NEW.location_id, NEW.quantity, NEW.quantity, movement_reason);
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (OLD.item_id, OLD.location_id, -OLD.quantity, 0, movement_reason);
+            ELSIF NEW.item_id <> OLD.item_id OR NEW.location_id IS DISTINCT FROM OLD.location_id THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (OLD.item_id, OLD.location_id, -OLD.quantity, 0, movement_reason),
+                       (NEW.item_id, NEW.location_id, NEW.quantity, NEW.quantity, movement_reason);
+            ELSIF NEW.quantity <> OLD.quantity THEN
+                INSERT INTO stock_movements (item_id, location_id, delta, quantity_after, reason)
+                VALUES (NEW.item_id, NEW.location_id, NEW.quantity - OLD.quantity, NEW.quantity, movement_reason);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # 作り直したテーブルにトリガーを付け直す
+    op.execute("""
+        CREATE TRIGGER trg_items_item_stock_totals
+        AFTER INSERT OR UPDATE OF min_threshold ON items
+        FOR EACH ROW EXECUTE FUNCTION sync_item_stock_total_threshold()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_item_stock_totals
+        AFTER INSERT OR DELETE OR UPDATE OF item_id, quantity ON stocks
+        FOR EACH ROW EXECUTE FUNCTION apply_item_stock_total_delta()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_stock_movements
+        AFTER INSERT OR DELETE OR UPDATE OF item_id, location_id, quantity ON stocks
+        FOR EACH ROW EXECUTE FUNCTION record_stock_movement()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_stocks_notify
+        AFTER INSERT OR DELETE OR UPDATE ON stocks
+        FOR EACH ROW EXECUTE FUNCTION notify_stock_change()
+    """)
+    for table in ('items', 'stocks'):
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_sync_tombstone
+            AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_touch_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_updated_at()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_bump_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """)
+
+    for table in ('items', 'stocks'):
+        op.execute(f"ANALYZE {table}")
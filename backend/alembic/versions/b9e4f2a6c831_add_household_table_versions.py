@@ -0,0 +1,99 @@
+"""version items and stocks per household
+
+Revision ID: b9e4f2a6c831
+Revises: 8d3f1b6a4e52
+Create Date: 2025-06-20 14:26:08.731502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4f2a6c831'
+down_revision = '8d3f1b6a4e52'
+branch_labels = None
+depends_on = None
+
+# 書き込みの多いテーブル。table_versions の1行を全世帯の書き込みが奪い合わないよう、世帯ごとに版を数える
+HOUSEHOLD_VERSIONED_TABLES = ['items', 'stocks']
+EVENTS = [('insert', 'INSERT', 'NEW'), ('update', 'UPDATE', 'NEW'), ('delete', 'DELETE', 'OLD')]
+
+
+def upgrade() -> None:
+    op.create_table('household_table_versions',
+    sa.Column('household_id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['household_id'], ['households.id']),
+    sa.PrimaryKeyConstraint('household_id', 'table_name')
+    )
+    # 既存のETagと番号が重ならないよう、全体の版数から続けて数える
+    op.execute(f"""
+        INSERT INTO household_table_versions (household_id, table_name, version)
+        SELECT h.id, v.table_name, v.version
+        FROM households h CROSS JOIN table_versions v
+        WHERE v.table_name IN ({", ".join(f"'{table}'" for table in HOUSEHOLD_VERSIONED_TABLES)})
+    """)
+
+    # 変更された行（遷移テーブル）に含まれる世帯だけ版を進める。0行の文では何もしない
+    # 複数世帯にまたがる文どうしがデッドロックしないよう、世帯IDの順に行をロックする
+    op.execute("""
+        CREATE FUNCTION bump_household_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO household_table_versions AS v (household_id, table_name, version)
+            SELECT DISTINCT household_id, TG_TABLE_NAME, 1 FROM changed_rows ORDER BY household_id
+            ON CONFLICT (household_id, table_name) DO UPDATE SET version = v.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # TRUNCATE には遷移テーブルが無いため、そのテーブルの全世帯の版を進める
+    op.execute("""
+        CREATE FUNCTION bump_household_table_version_all() RETURNS trigger AS $$
+        BEGIN
+            UPDATE household_table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in HOUSEHOLD_VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER trg_{table}_bump_version ON {table}")
+        for name, event, transition in EVENTS:
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_bump_version_{name}
+                AFTER {event} ON {table}
+                REFERENCING {transition} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_household_table_version()
+            """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_bump_version_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_household_table_version_all()
+        """)
+    op.execute(f"""
+        DELETE FROM table_versions
+        WHERE table_name IN ({", ".join(f"'{table}'" for table in HOUSEHOLD_VERSIONED_TABLES)})
+    """)
+
+
+def downgrade() -> None:
+    for table in HOUSEHOLD_VERSIONED_TABLES:
+        for name, _, _ in EVENTS + [('truncate', 'TRUNCATE', None)]:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_bump_version_{name} ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_bump_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """)
+    # 戻した後のETagが以前のものと重ならないよう、世帯ごとの版数の最大から続ける
+    op.execute(f"""
+        INSERT INTO table_versions (table_name, version)
+        SELECT t.table_name, coalesce(max(v.version), 0)
+        FROM (VALUES {", ".join(f"('{table}')" for table in HOUSEHOLD_VERSIONED_TABLES)}) AS t (table_name)
+        LEFT JOIN household_table_versions v ON v.table_name = t.table_name
+        GROUP BY t.table_name
+    """)
+    op.execute("DROP FUNCTION IF EXISTS bump_household_table_version_all()")
+    op.execute("DROP FUNCTION IF EXISTS bump_household_table_version()")
+    op.drop_table('household_table_versions')
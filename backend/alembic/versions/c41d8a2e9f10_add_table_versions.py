@@ -0,0 +1,53 @@
+"""add table change versions
+
+Revision ID: c41d8a2e9f10
+Revises: 0b72de95c5b7
+Create Date: 2025-06-09 10:12:44.105392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d8a2e9f10'
+down_revision = '0b72de95c5b7'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['categories', 'items', 'locations', 'stocks']
+
+
+def upgrade() -> None:
+    op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute(
+        "INSERT INTO table_versions (table_name) VALUES "
+        + ", ".join(f"('{table}')" for table in VERSIONED_TABLES)
+    )
+
+    # 文単位で1回だけ版を進める（トランザクション内の更新なので、コミットされるまで他から見えない）
+    op.execute("""
+        CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in VERSIONED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_bump_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """)
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_bump_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_versions')
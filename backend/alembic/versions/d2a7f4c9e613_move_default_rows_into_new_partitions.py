@@ -0,0 +1,73 @@
+"""move rows out of stock_movements_default when creating monthly partitions
+
+Revision ID: d2a7f4c9e613
+Revises: b9e4f2a6c831
+Create Date: 2025-06-20 16:48:51.290113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7f4c9e613'
+down_revision = 'b9e4f2a6c831'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 既定パーティションに範囲内の行があると PARTITION OF での作成は失敗するため、
+    # 新しいテーブルにその行を移してから ATTACH PARTITION で取り付ける（同じトランザクション内で行う）
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_stock_movement_partitions(months_ahead integer DEFAULT 2) RETURNS void AS $$
+        DECLARE
+            month_start date := date_trunc('month', now())::date;
+            partition_start date;
+            partition_end date;
+            partition_name text;
+        BEGIN
+            FOR i IN 0..months_ahead LOOP
+                partition_start := (month_start + make_interval(months => i))::date;
+                partition_end := (partition_start + interval '1 month')::date;
+                partition_name := 'stock_movements_' || to_char(partition_start, 'YYYYMM');
+                CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE stock_movements INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    partition_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM stock_movements_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    partition_start, partition_end, partition_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE stock_movements ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, partition_start, partition_end
+                );
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_stock_movement_partitions(months_ahead integer DEFAULT 2) RETURNS void AS $$
+        DECLARE
+            month_start date := date_trunc('month', now())::date;
+            partition_start date;
+        BEGIN
+            FOR i IN 0..months_ahead LOOP
+                partition_start := (month_start + make_interval(months => i))::date;
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF stock_movements FOR VALUES FROM (%L) TO (%L)',
+                    'stock_movements_' || to_char(partition_start, 'YYYYMM'),
+                    partition_start,
+                    (partition_start + interval '1 month')::date
+                );
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
@@ -0,0 +1,180 @@
+"""replace table version counters with an append-only change log
+
+Revision ID: e7c3a9d5b104
+Revises: d2a7f4c9e613
+Create Date: 2025-06-27 11:05:37.482019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c3a9d5b104'
+down_revision = 'd2a7f4c9e613'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['categories', 'items', 'locations', 'stocks']
+# これまで世帯ごとに数えていたテーブル（それ以外は table_versions の全世帯共通の版数）
+HOUSEHOLD_VERSIONED_TABLES = ['items', 'stocks']
+EVENTS = [('insert', 'INSERT', 'NEW'), ('update', 'UPDATE', 'NEW'), ('delete', 'DELETE', 'OLD')]
+
+
+def _table_list(tables) -> str:
+    return ", ".join(f"'{table}'" for table in tables)
+
+
+def upgrade() -> None:
+    op.create_table('table_changes',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('household_id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('weight', sa.BigInteger(), server_default='1', nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['household_id'], ['households.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_table_changes_household_id_table_name', 'table_changes', ['household_id', 'table_name'],
+                    postgresql_include=['weight'])
+
+    # 既存のETagと番号が重ならないよう、これまでの版数を最初の weight にする
+    op.execute(f"""
+        INSERT INTO table_changes (household_id, table_name, weight)
+        SELECT household_id, table_name, version FROM household_table_versions
+        WHERE table_name IN ({_table_list(HOUSEHOLD_VERSIONED_TABLES)}) AND version > 0
+        UNION ALL
+        SELECT h.id, v.table_name, v.version
+        FROM households h CROSS JOIN table_versions v
+        WHERE v.table_name NOT IN ({_table_list(HOUSEHOLD_VERSIONED_TABLES)}) AND v.version > 0
+    """)
+
+    # 変更された行（遷移テーブル）に含まれる世帯ごとに1行追記する。行を更新しないので書き込みどうしは待ち合わない
+    op.execute("""
+        CREATE FUNCTION record_table_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_changes (household_id, table_name)
+            SELECT DISTINCT household_id, TG_TABLE_NAME FROM changed_rows;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # TRUNCATE には遷移テーブルが無いため、全世帯に追記する
+    op.execute("""
+        CREATE FUNCTION record_table_change_all() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_changes (household_id, table_name)
+            SELECT id, TG_TABLE_NAME FROM households;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in VERSIONED_TABLES:
+        if table in HOUSEHOLD_VERSIONED_TABLES:
+            for name, _, _ in EVENTS + [('truncate', 'TRUNCATE', None)]:
+                op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_bump_version_{name} ON {table}")
+        else:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_bump_version ON {table}")
+        for name, event, transition in EVENTS:
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_record_change_{name}
+                AFTER {event} ON {table}
+                REFERENCING {transition} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION record_table_change()
+            """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_record_change_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION record_table_change_all()
+        """)
+
+    op.execute("DROP FUNCTION IF EXISTS bump_household_table_version_all()")
+    op.execute("DROP FUNCTION IF EXISTS bump_household_table_version()")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('household_table_versions')
+    op.drop_table('table_versions')
+
+
+def downgrade() -> None:
+    op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.create_table('household_table_versions',
+    sa.Column('household_id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['household_id'], ['households.id']),
+    sa.PrimaryKeyConstraint('household_id', 'table_name')
+    )
+    # 戻した後のETagが以前のものと重ならないよう、変更記録の合計から続ける
+    op.execute(f"""
+        INSERT INTO household_table_versions (household_id, table_name, version)
+        SELECT household_id, table_name, sum(weight) FROM table_changes
+        WHERE table_name IN ({_table_list(HOUSEHOLD_VERSIONED_TABLES)})
+        GROUP BY household_id, table_name
+    """)
+    op.execute(f"""
+        INSERT INTO table_versions (table_name, version)
+        SELECT t.table_name, coalesce(max(c.version), 0)
+        FROM (VALUES {", ".join(f"('{table}')" for table in VERSIONED_TABLES if table not in HOUSEHOLD_VERSIONED_TABLES)}) AS t (table_name)
+        LEFT JOIN (
+            SELECT table_name, sum(weight) AS version FROM table_changes GROUP BY household_id, table_name
+        ) c ON c.table_name = t.table_name
+        GROUP BY t.table_name
+    """)
+
+    op.execute("""
+        CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION bump_household_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO household_table_versions AS v (household_id, table_name, version)
+            SELECT DISTINCT household_id, TG_TABLE_NAME, 1 FROM changed_rows ORDER BY household_id
+            ON CONFLICT (household_id, table_name) DO UPDATE SET version = v.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION bump_household_table_version_all() RETURNS trigger AS $$
+        BEGIN
+            UPDATE household_table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in VERSIONED_TABLES:
+        for name, _, _ in EVENTS + [('truncate', 'TRUNCATE', None)]:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_record_change_{name} ON {table}")
+        if table in HOUSEHOLD_VERSIONED_TABLES:
+            for name, event, transition in EVENTS:
+                op.execute(f"""
+                    CREATE TRIGGER trg_{table}_bump_version_{name}
+                    AFTER {event} ON {table}
+                    REFERENCING {transition} TABLE AS changed_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION bump_household_table_version()
+                """)
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_bump_version_truncate
+                AFTER TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_household_table_version_all()
+            """)
+        else:
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_bump_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+            """)
+
+    op.execute("DROP FUNCTION IF EXISTS record_table_change_all()")
+    op.execute("DROP FUNCTION IF EXISTS record_table_change()")
+    op.drop_index('ix_table_changes_household_id_table_name', table_name='table_changes')
+    op.drop_table('table_changes')
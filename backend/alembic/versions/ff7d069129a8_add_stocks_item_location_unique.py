@@ -0,0 +1,43 @@
+"""add stocks item_id/location_id unique constraint
+
+Revision ID: ff7d069129a8
+Revises: 556d468c0076
+Create Date: 2025-05-14 09:42:17.503921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff7d069129a8'
+down_revision = '556d468c0076'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 既存の重複行は最小IDの行に数量を合算してから削除する
+    op.execute("""
+        UPDATE stocks s
+        SET quantity = d.total
+        FROM (
+            SELECT MIN(id) AS keep_id, SUM(quantity) AS total
+            FROM stocks
+            GROUP BY item_id, location_id
+            HAVING COUNT(*) > 1
+        ) d
+        WHERE s.id = d.keep_id
+    """)
+    op.execute("""
+        DELETE FROM stocks s
+        USING stocks k
+        WHERE s.item_id = k.item_id
+          AND s.location_id IS NOT DISTINCT FROM k.location_id
+          AND s.id > k.id
+    """)
+    op.create_unique_constraint('uq_stocks_item_id_location_id', 'stocks', ['item_id', 'location_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_stocks_item_id_location_id', 'stocks', type_='unique')
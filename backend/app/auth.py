@@ -0,0 +1,52 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Optional
+
+# アクセストークン（Authorization: Bearer）の署名鍵。未設定の場合はすべてのトークンを無効とする
+AUTH_SECRET = os.getenv("AUTH_SECRET", "")
+TOKEN_PREFIX = "v1"
+
+# トークンは「v1.<内容>.<署名>」の形で、内容は世帯ID（hid）と有効期限（exp, UNIX時刻）のJSON
+# サーバーの鍵で HMAC-SHA256 署名しているため、クライアントが世帯を書き換えることはできない
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode((value + "=" * (-len(value) % 4)).encode("ascii"))
+
+def _sign(message: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), message.encode(), hashlib.sha256).digest())
+
+def issue_token(household_id: int, ttl_seconds: int = 86400, secret: Optional[str] = None) -> str:
+    """世帯のアクセストークンを発行する"""
+    secret = secret or AUTH_SECRET
+    if not secret:
+        raise RuntimeError("AUTH_SECRET is not set")
+    payload = json.dumps({"hid": household_id, "exp": int(time.time()) + ttl_seconds}, separators=(",", ":"))
+    message = f"{TOKEN_PREFIX}.{_b64encode(payload.encode())}"
+    return f"{message}.{_sign(message, secret)}"
+
+def verify_token(token: str, secret: Optional[str] = None) -> Optional[int]:
+    """トークンを検証して世帯IDを返す（署名・期限・形式のいずれかが不正なら None）"""
+    secret = secret or AUTH_SECRET
+    if not secret:
+        return None
+    try:
+        prefix, body, signature = token.split(".")
+    except ValueError:
+        return None
+    if prefix != TOKEN_PREFIX or not hmac.compare_digest(signature, _sign(f"{prefix}.{body}", secret)):
+        return None
+    try:
+        payload = json.loads(_b64decode(body))
+        household_id, expires_at = int(payload["hid"]), int(payload["exp"])
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        return None
+    if household_id <= 0 or expires_at < time.time():
+        return None
+    return household_id
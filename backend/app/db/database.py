@@ -1,25 +1,187 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import asyncio
 import os
+import time
+from typing import Any, Dict
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.db.tenancy import household_from_request, set_household
 
 # 環境変数からデータベースURLを取得
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+asyncpg://postgres:postgres@db:5432/inventory_db")
+# 読み取り用のレプリカ（未設定の場合は読み取り用のプールもプライマリに接続する）
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
 
-# 非同期エンジンの作成
-engine = create_async_engine(DATABASE_URL, echo=True)
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
 
-# 非同期セッションの作成
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+# 書き込み後、この秒数だけ同じクライアントの読み取りをプライマリに向ける（レプリカの遅延対策）
+READ_STICKY_SECONDS = _env_int("DB_READ_STICKY_SECONDS", 5)
+READ_STICKY_COOKIE = "db_primary_until"
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """コネクションの取得待ち時間を記録するコネクションプール"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_count = 0
+        self.checkout_wait_seconds = 0.0
+        self.checkout_wait_max_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.checkout_count += 1
+            self.checkout_wait_seconds += waited
+            self.checkout_wait_max_seconds = max(self.checkout_wait_max_seconds, waited)
+
+def create_engine_from_env(url: str = DATABASE_URL, prefix: str = "DB_", readonly: bool = False) -> AsyncEngine:
+    """
+    環境変数の設定で非同期エンジンを作成する。
+    DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE / DB_POOL_PRE_PING /
+    DB_STATEMENT_CACHE_SIZE / DB_ECHO
+    prefix を指定した場合は {prefix}POOL_SIZE などを優先し、無ければ DB_ の値を使う。
+    readonly=True のエンジンではトランザクションを READ ONLY で開始する。
+    """
+    def setting(name: str, default):
+        return os.getenv(f"{prefix}{name}", os.getenv(f"DB_{name}", default))
+
+    statement_cache_size = int(setting("STATEMENT_CACHE_SIZE", 100))
+    return create_async_engine(
+        url,
+        echo=_env_bool("DB_ECHO", False),
+        poolclass=InstrumentedQueuePool,
+        pool_size=int(setting("POOL_SIZE", 5)),
+        max_overflow=int(setting("MAX_OVERFLOW", 10)),
+        pool_timeout=int(setting("POOL_TIMEOUT", 30)),
+        pool_recycle=int(setting("POOL_RECYCLE", 1800)),
+        pool_pre_ping=str(setting("POOL_PRE_PING", True)).lower() in ("1", "true", "yes", "on"),
+        execution_options={"postgresql_readonly": True} if readonly else {},
+        connect_args={
+            # SQLAlchemy側と asyncpg側のプリペアドステートメントキャッシュ（pgbouncer 利用時は 0）
+            "prepared_statement_cache_size": statement_cache_size,
+            "statement_cache_size": statement_cache_size,
+        },
+    )
+
+# 書き込み用・読み取り用のエンジン（プロセスに1つずつ。インポート時ではなく init_engines() で作成する）
+ENGINES: Dict[str, AsyncEngine] = {}
+
+# 非同期セッションの作成（エンジンは init_engines() で結びつける）
+AsyncSessionLocal = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+ReadSessionLocal = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+def init_engines() -> Dict[str, AsyncEngine]:
+    """
+    エンジンを作成してセッションに結びつける（作成済みならそのまま返す）。
+    アプリでは lifespan の起動処理で呼ばれ、スクリプトでは app.db.session のインポート時に呼ばれる。
+    """
+    if not ENGINES:
+        ENGINES["write"] = create_engine_from_env()
+        ENGINES["read"] = create_engine_from_env(DATABASE_READ_URL or DATABASE_URL, prefix="DB_READ_", readonly=True)
+        AsyncSessionLocal.configure(bind=ENGINES["write"])
+        ReadSessionLocal.configure(bind=ENGINES["read"])
+    return ENGINES
+
+def get_engine(role: str = "write") -> AsyncEngine:
+    return init_engines()[role]
+
+def _is_sticky(request: Request) -> bool:
+    """直前に書き込んだクライアントか（Cookie の期限内か）"""
+    try:
+        return float(request.cookies.get(READ_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
 
 # 依存性として使用するデータベースセッションの取得関数
-async def get_db():
+async def get_write_db(request: Request, response: Response):
     """
-    データベースセッションを提供する依存性関数
+    書き込み用（プライマリ）のデータベースセッションを提供する依存性関数。
+    セッションはアクセストークンの世帯に絞り込まれる（トークンが無い・不正な場合は 401）。
+    レプリカ利用時は、しばらくの間このクライアントの読み取りもプライマリに向ける Cookie を付ける。
     """
+    if DATABASE_READ_URL and READ_STICKY_SECONDS > 0:
+        response.set_cookie(
+            READ_STICKY_COOKIE,
+            str(time.time() + READ_STICKY_SECONDS),
+            max_age=READ_STICKY_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    household_id = household_from_request(request)
+    init_engines()
     async with AsyncSessionLocal() as session:
+        set_household(session, household_id)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_read_db(request: Request):
+    """
+    読み取り専用のデータベースセッションを提供する依存性関数（GET のエンドポイント用）。
+    レプリカがある場合はレプリカに接続し、直前に書き込んだクライアントはプライマリに接続する。
+    セッションはアクセストークンの世帯に絞り込まれる（トークンが無い・不正な場合は 401）。
+    """
+    household_id = household_from_request(request)
+    init_engines()
+    session_factory = AsyncSessionLocal if DATABASE_READ_URL and _is_sticky(request) else ReadSessionLocal
+    async with session_factory() as session:
+        set_household(session, household_id)
         try:
             yield session
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close()
+
+async def warm_up_pool(size: int = 0) -> None:
+    """起動時にプールのコネクションを確立しておく（省略時は pool_size 分、DB_WARM_UP=false で無効）"""
+    if not _env_bool("DB_WARM_UP", True):
+        return
+
+    async def _connect(target: AsyncEngine):
+        connection = await target.connect()
+        await connection.execute(text("SELECT 1"))
+        return connection
+
+    for target in init_engines().values():
+        # 同時に保持しないと同じコネクションが再利用されるため、まとめて取得してから返す
+        connections = await asyncio.gather(*(_connect(target) for _ in range(size or target.pool.size())))
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+async def dispose_engines() -> None:
+    """エンジンを破棄する（次の init_engines() で作り直される）"""
+    for target in ENGINES.values():
+        await target.dispose()
+    ENGINES.clear()
+    AsyncSessionLocal.configure(bind=None)
+    ReadSessionLocal.configure(bind=None)
+
+def _pool_stats(target: AsyncEngine) -> Dict[str, Any]:
+    pool = target.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checkout_count": pool.checkout_count,
+        "checkout_wait_seconds": round(pool.checkout_wait_seconds, 6),
+        "checkout_wait_max_seconds": round(pool.checkout_wait_max_seconds, 6),
+    }
+
+def get_pool_stats() -> Dict[str, Any]:
+    """コネクションプールの状態（ワーカープロセス単位、書き込み用・読み取り用ごと）"""
+    return {
+        "pid": os.getpid(),
+        "replica": DATABASE_READ_URL is not None,
+        "pools": {role: _pool_stats(target) for role, target in ENGINES.items()},
+    }
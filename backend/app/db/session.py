@@ -1,9 +1,5 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-import os
+# スクリプト向けの別名（エンジンは app.db.database の書き込み用を共有する）
+# アプリと違い lifespan を通らないため、インポート時にエンジンを作成する
+from app.db.database import AsyncSessionLocal as SessionLocal, get_engine
 
-# 環境変数からデータベースURLを取得
-DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+asyncpg://postgres:postgres@db:5432/inventory_db")
-
-engine = create_async_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+engine = get_engine()
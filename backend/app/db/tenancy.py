@@ -0,0 +1,73 @@
+import os
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from app.models.household import HouseholdScoped
+from app.auth import verify_token
+
+# リクエストによらない処理（スクリプト・定期ジョブ）が使う世帯
+DEFAULT_HOUSEHOLD_ID = int(os.getenv("DEFAULT_HOUSEHOLD_ID", 1))
+# EventSource はヘッダーを付けられないため、SSE ではクエリパラメーターのトークンも受け付ける
+ACCESS_TOKEN_PARAM = "access_token"
+
+def household_from_request(request: Request, allow_query_token: bool = False) -> int:
+    """
+    認証済みのアクセストークン（Authorization: Bearer）から世帯IDを取得する。
+    世帯はサーバーが署名したトークンの内容だけで決まり、トークンが無い・不正な場合は 401 とする。
+    """
+    household_id = getattr(request.state, "household_id", None)
+    if household_id is not None:
+        return household_id
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = request.query_params.get(ACCESS_TOKEN_PARAM, "") if allow_query_token else ""
+    household_id = verify_token(token.strip()) if token else None
+    if household_id is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or missing access token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    request.state.household_id = household_id
+    return household_id
+
+def set_household(session, household_id: int) -> None:
+    """セッションの世帯を設定する（AsyncSession / Session のどちらでもよい）"""
+    session.info["household_id"] = household_id
+
+def get_household(session) -> int:
+    """セッションの世帯を返す（未設定なら既定の世帯）"""
+    return session.info.get("household_id", DEFAULT_HOUSEHOLD_ID)
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_household(state: ORMExecuteState) -> None:
+    """
+    ORM の SELECT / UPDATE / DELETE に世帯の条件を付ける。
+    items / stocks は世帯IDでパーティション分割しているため、この条件で1つのパーティションに絞り込まれる。
+    text() の生SQLには付かないので、生SQLでは get_household() の値を明示的に渡すこと。
+    """
+    household_id = state.session.info.get("household_id")
+    if household_id is None:
+        return
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    # リレーションの読み込みには元のクエリの条件が引き継がれる
+    if state.is_column_load or state.is_relationship_load:
+        return
+    state.statement = state.statement.options(
+        with_loader_criteria(
+            HouseholdScoped,
+            lambda cls: cls.household_id == household_id,
+            include_aliases=True,
+        )
+    )
+
+@event.listens_for(Session, "before_flush")
+def _assign_household(session: Session, flush_context, instances) -> None:
+    """追加するオブジェクトにセッションの世帯を設定する"""
+    household_id = get_household(session)
+    for obj in session.new:
+        if isinstance(obj, HouseholdScoped) and obj.household_id is None:
+            obj.household_id = household_id
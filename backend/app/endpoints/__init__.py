@@ -1,5 +1,24 @@
-from .root import router as root_router
-from .items import router as items_router
-from .stocks import router as stocks_router
-from .locations import router as locations_router
-from .categories import router as categories_router
+from importlib import import_module
+
+# 各ルーターは参照されたときに初めてインポートする（create_app() で使わないルーターは読み込まない）
+_ROUTER_MODULES = {
+    "root_router": "root",
+    "items_router": "items",
+    "stocks_router": "stocks",
+    "locations_router": "locations",
+    "categories_router": "categories",
+    "export_router": "export",
+    "imports_router": "imports",
+    "history_router": "history",
+    "metrics_router": "metrics",
+    "sync_router": "sync",
+    "dashboard_router": "dashboard",
+    "floor_router": "floor",
+    "forecast_router": "forecast",
+}
+
+def __getattr__(name: str):
+    module = _ROUTER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return import_module(f"{__name__}.{module}").router
@@ -2,18 +2,23 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.db.database import get_read_db
 from app.service import category as category_crud
+from app.service import fast_read
+from app.service.conditional import conditional_get
 from app.schemas import Category
 
 router = APIRouter()
 
-@router.get("/categories/", response_model=List[Category])
+@router.get("/categories/", response_model=List[Category], dependencies=[Depends(conditional_get("categories"))])
 async def read_categories(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     すべてのカテゴリを取得します。
     """
-    categories = await category_crud.get_categories(db)
+    as_rows = fast_read.enabled()
+    categories = await category_crud.get_categories(db, as_rows=as_rows)
+    if as_rows:
+        return fast_read.rows_response(categories)
     return categories
\ No newline at end of file
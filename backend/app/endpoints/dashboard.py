@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_read_db
+from app.schemas import DashboardSummary
+from app.service import dashboard as dashboard_service
+
+router = APIRouter()
+
+@router.get("/dashboard/summary", response_model=DashboardSummary)
+async def read_dashboard_summary(db: AsyncSession = Depends(get_read_db)):
+    """
+    ロケーション別・カテゴリ別・全体の在庫集計（アイテム数・在庫行数・数量合計・在庫不足数）を取得します。
+    データが変わらない限りキャッシュした結果を返します。
+    """
+    return await dashboard_service.get_dashboard_summary(db)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.db.tenancy import household_from_request
+from app.service import export as export_service
+
+router = APIRouter()
+
+@router.get("/export/stocks")
+async def export_stocks(
+    request: Request,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+):
+    """
+    商品・カテゴリ・ロケーションを結合した世帯の全在庫をストリーミングでエクスポートします。
+    サーバーサイドカーソルで一定行数ずつ取得するため、件数に関わらずメモリ使用量は一定です。
+    """
+    household_id = household_from_request(request)
+    if format == "csv":
+        return StreamingResponse(
+            export_service.iter_stocks_csv(household_id=household_id),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="stocks.csv"'},
+        )
+    return StreamingResponse(
+        export_service.iter_stocks_ndjson(household_id=household_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="stocks.ndjson"'},
+    )
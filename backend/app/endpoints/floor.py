@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_read_db
+from app.schemas import FloorOccupancy
+from app.service import floor as floor_service
+from app.service.conditional import conditional_get
+
+router = APIRouter()
+
+@router.get(
+    "/floor/occupancy",
+    response_model=FloorOccupancy,
+    dependencies=[Depends(conditional_get(*floor_service.OCCUPANCY_TABLES))],
+)
+async def read_floor_occupancy(db: AsyncSession = Depends(get_read_db)):
+    """
+    間取り図の部屋ごとに、アイテム数・数量合計・在庫不足のアイテム数を取得します。
+    部屋とロケーションの対応はサーバー側で管理し、在庫が変わるまでキャッシュした結果を返します。
+    """
+    return await floor_service.get_floor_occupancy(db)
@@ -0,0 +1,24 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_read_db
+from app.schemas import ItemForecast
+from app.service import forecast as forecast_service
+
+router = APIRouter()
+
+@router.get("/items/forecast", response_model=List[ItemForecast])
+async def read_item_forecasts(
+    sort: str = Query("depletion", regex="^(" + "|".join(forecast_service.FORECAST_SORT_COLUMNS) + ")$"),
+    include_idle: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    アイテムの在庫切れ予測を、在庫切れ（sort=threshold の場合は min_threshold 割れ）が近い順に取得します。
+    予測は定期的に作り直され、include_idle=true で消費の無いアイテムも含めます。
+    """
+    forecasts = await forecast_service.get_forecasts(db, sort=sort, skip=skip, limit=limit, include_idle=include_idle)
+    return forecasts
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_read_db
+from app.schemas import StockMovement, StockAtTime
+from app.service import stock_movement as movement_crud
+
+router = APIRouter()
+
+@router.get("/items/{item_id}/movements", response_model=List[StockMovement])
+async def read_item_movements(
+    item_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    アイテムの在庫の増減履歴を新しい順に取得します。
+    """
+    movements = await movement_crud.get_item_movements(db, item_id, since=since, until=until, limit=limit)
+    return movements
+
+@router.get("/items/{item_id}/stock-at", response_model=List[StockAtTime])
+async def read_item_stock_at(
+    item_id: int,
+    at: datetime,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    指定した時点でのアイテムのロケーションごとの在庫数を取得します。
+    """
+    stocks = await movement_crud.get_item_stock_at(db, item_id, at)
+    return stocks
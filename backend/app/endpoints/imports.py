@@ -0,0 +1,28 @@
+import csv
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_write_db
+from app.schemas import ImportReport
+from app.service import importer
+
+router = APIRouter()
+
+@router.post("/import", response_model=ImportReport)
+async def import_inventory(
+    request: Request,
+    format: str = Query("csv", regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    リクエストボディのCSV（ヘッダー付き）またはNDJSONを一括でインポートします。
+    列: barcode, item_name, category_name, location_name, quantity, min_threshold
+    ボディは受信しながら解析し、まとまった行数ごとに取り込みます（不正な行があれば全体を取り消します）。
+    """
+    try:
+        report = await importer.import_inventory(db, request.stream(), fmt=format)
+    except (ValueError, csv.Error) as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return report
@@ -1,21 +1,100 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.db.database import get_read_db
 from app.service import item as item_crud
-from app.schemas import Item
+from app.service import expand, fast_read
+from app.service.conditional import conditional_get
+from app.models.item import Item as ItemModel
+from app.schemas import Item, ItemPage, ItemSearchResult, LowStockItem
 
 router = APIRouter()
 
-@router.get("/items/", response_model=List[Item])
+@router.get(
+    "/items/",
+    response_model=Union[ItemPage, List[Item]],
+    dependencies=[Depends(conditional_get("items", expand_model=ItemModel))],
+)
 async def read_items(
     skip: int = 0, 
-    limit: int = 25, 
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(25, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="カンマ区切りのアイテムID（例: 1,2,3）"),
+    include: Optional[str] = Query(None, description="展開するリレーションシップ（例: category,stocks.location）"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     すべてのアイテムを取得します。
+    cursor を指定した場合（初回は空文字）は (name, id) 順のキーセットページネーションとなり、
+    next_cursor 付きで返します。未指定の場合は従来どおり skip/limit で配列を返します。
+    ids を指定した場合はそのIDのアイテムだけを返し、include を指定した場合は関連するデータを含めて返します。
     """
-    items = await item_crud.get_items(db, skip=skip, limit=limit)
-    return items
\ No newline at end of file
+    id_list = expand.parse_ids(ids)
+    tree = expand.parse_include(ItemModel, include)
+    options = expand.load_options(ItemModel, tree)
+    as_rows = fast_read.enabled() and not tree
+    if cursor is not None and id_list is None:
+        items, next_cursor = await item_crud.get_items_page(db, cursor=cursor, limit=limit, as_rows=as_rows, options=options)
+        if tree:
+            return expand.expanded_response(items, tree, next_cursor=next_cursor)
+        if as_rows:
+            return fast_read.rows_response(items, next_cursor=next_cursor)
+        return ItemPage(items=items, next_cursor=next_cursor)
+    items = await item_crud.get_items(db, skip=skip, limit=limit, as_rows=as_rows, ids=id_list, options=options)
+    if tree:
+        return expand.expanded_response(items, tree)
+    if as_rows:
+        return fast_read.rows_response(items)
+    return items
+
+
+@router.get("/items/search", response_model=List[ItemSearchResult], dependencies=[Depends(conditional_get("items"))])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    商品名で全アイテムを検索します（部分一致・表記ゆれに対応）。
+    部分一致するものを優先し、類似度の高い順に返します。
+    """
+    items = await item_crud.search_items(db, q, limit=limit)
+    return items
+
+@router.get("/items/low-stock", response_model=List[LowStockItem], dependencies=[Depends(conditional_get("items", "stocks"))])
+async def read_low_stock_items(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    全ロケーションの在庫合計が min_threshold を下回っているアイテムを取得します。
+    """
+    items = await item_crud.get_low_stock_items(db, skip=skip, limit=limit)
+    return items
+
+@router.get("/items/by-barcode/{barcode}", response_model=Item)
+async def read_item_by_barcode(
+    barcode: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    バーコードに一致するアイテムを取得します。
+    """
+    item = await item_crud.get_item_by_barcode(db, barcode)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+@router.post("/items/by-barcode", response_model=Dict[str, Optional[Item]])
+async def read_items_by_barcodes(
+    barcodes: List[str] = Body(..., max_items=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    複数のバーコードに一致するアイテムをまとめて取得します。
+    見つからないバーコードは null を返します。
+    """
+    items = await item_crud.get_items_by_barcodes(db, barcodes)
+    return items
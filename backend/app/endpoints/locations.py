@@ -1,17 +1,38 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.db.database import get_read_db
+from app.models.location import Location as LocationModel
 from app.schemas import Location
 from app.service import location as location_crud
+from app.service import expand, fast_read
+from app.service.conditional import conditional_get
 
 router = APIRouter()
 
-@router.get("/locations", response_model=List[Location])
-async def read_locations(db: AsyncSession = Depends(get_db)):
+@router.get(
+    "/locations",
+    response_model=List[Location],
+    dependencies=[Depends(conditional_get("locations", expand_model=LocationModel))],
+)
+async def read_locations(
+    ids: Optional[str] = Query(None, description="カンマ区切りのロケーションID（例: 1,2,3）"),
+    include: Optional[str] = Query(None, description="展開するリレーションシップ（例: stocks.item）"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     すべてのロケーションを取得します。
+    ids を指定した場合はそのIDのロケーションだけを返し、include を指定した場合は関連するデータを含めて返します。
     """
-    locations = await location_crud.get_locations(db)
+    id_list = expand.parse_ids(ids)
+    tree = expand.parse_include(LocationModel, include)
+    as_rows = fast_read.enabled() and not tree
+    locations = await location_crud.get_locations(
+        db, as_rows=as_rows, ids=id_list, options=expand.load_options(LocationModel, tree)
+    )
+    if tree:
+        return expand.expanded_response(locations, tree)
+    if as_rows:
+        return fast_read.rows_response(locations)
     return locations
\ No newline at end of file
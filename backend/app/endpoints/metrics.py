@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.monitoring.metrics import registry
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    """
+    Prometheus テキスト形式のメトリクスを返します（ワーカープロセス単位）。
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
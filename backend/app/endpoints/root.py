@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from app.db.database import get_pool_stats
+from app.service.scheduler import scheduler
+
 router = APIRouter()
 
 @router.get("/")
@@ -8,4 +11,14 @@ async def read_root():
 
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@router.get("/health/pool")
+async def pool_stats():
+    """コネクションプールの使用状況（ワーカーごと）"""
+    return get_pool_stats()
+
+@router.get("/health/jobs")
+async def job_stats():
+    """定期ジョブの実行状況（ワーカーごと）"""
+    return scheduler.stats()
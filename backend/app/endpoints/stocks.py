@@ -1,21 +1,160 @@
-from typing import List
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.db.database import get_read_db, get_write_db
+from app.db.tenancy import household_from_request
 from app.service import stock as stock_crud
-from app.schemas import Stock
+from app.service import expand, fast_read
+from app.service.conditional import conditional_get
+from app.service.stock_events import broker
+from app.models.stock import Stock as StockModel
+from app.schemas import Stock, StockPage, StockView, StockAdjust, StockBatchEntry, StockBatchResult
 
 router = APIRouter()
 
-@router.get("/stocks/", response_model=List[Stock])
+@router.get(
+    "/stocks/",
+    response_model=Union[StockPage, List[Stock]],
+    dependencies=[Depends(conditional_get("stocks", expand_model=StockModel))],
+)
 async def read_stocks(
     skip: int = 0, 
-    limit: int = 25, 
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(25, ge=1, le=1000), 
+    cursor: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="カンマ区切りの在庫ID（例: 1,2,3）"),
+    include: Optional[str] = Query(None, description="展開するリレーションシップ（例: item.category,location）"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     すべての在庫情報を取得します。
+    cursor を指定した場合（初回は空文字）は (updated_at, id) 順のキーセットページネーションとなり、
+    next_cursor 付きで返します。未指定の場合は従来どおり skip/limit で配列を返します。
+    ids を指定した場合はそのIDの在庫だけを返し、include を指定した場合は関連するデータを含めて返します。
     """
-    stocks = await stock_crud.get_stocks(db, skip=skip, limit=limit)
-    return stocks
\ No newline at end of file
+    id_list = expand.parse_ids(ids)
+    tree = expand.parse_include(StockModel, include)
+    options = expand.load_options(StockModel, tree)
+    as_rows = fast_read.enabled() and not tree
+    if cursor is not None and id_list is None:
+        stocks, next_cursor = await stock_crud.get_stocks_page(db, cursor=cursor, limit=limit, as_rows=as_rows, options=options)
+        if tree:
+            return expand.expanded_response(stocks, tree, next_cursor=next_cursor)
+        if as_rows:
+            return fast_read.rows_response(stocks, next_cursor=next_cursor)
+        return StockPage(items=stocks, next_cursor=next_cursor)
+    stocks = await stock_crud.get_stocks(db, skip=skip, limit=limit, as_rows=as_rows, ids=id_list, options=options)
+    if tree:
+        return expand.expanded_response(stocks, tree)
+    if as_rows:
+        return fast_read.rows_response(stocks)
+    return stocks
+
+# SSE の接続維持のためのコメント送信間隔（秒）
+STREAM_HEARTBEAT_SECONDS = 15
+
+@router.get("/stocks/stream")
+async def stream_stocks(
+    request: Request,
+    location_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+):
+    """
+    在庫の変更を Server-Sent Events で配信します（ロケーション・カテゴリで絞り込み可）。
+    event: stock は変更された在庫行、event: resync は一覧の再取得が必要なこと（一括変更・取りこぼし）を表します。
+    """
+    subscriber = broker.subscribe(
+        household_id=household_from_request(request, allow_query_token=True), location_id=location_id, category_id=category_id
+    )
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                name = "stock" if event["op"] in ("INSERT", "UPDATE", "DELETE") else "resync"
+                yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get(
+    "/stocks/view",
+    response_model=List[StockView],
+    dependencies=[Depends(conditional_get("stocks", "items", "locations", "categories"))],
+)
+async def read_stock_view(
+    category_id: Optional[int] = None,
+    location: Optional[str] = None,
+    keyword: Optional[str] = None,
+    sort: str = Query("itemName", regex="^(" + "|".join(stock_crud.STOCK_VIEW_SORT_COLUMNS) + ")$"),
+    order: str = Query("asc", regex="^(asc|desc)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    商品名・保管場所名・カテゴリ名を結合した在庫一覧を取得します。
+    カテゴリ・保管場所・キーワードでの絞り込みと並び替えはDB側で行います。
+    """
+    stocks = await stock_crud.get_stock_view(
+        db,
+        category_id=category_id,
+        location=location,
+        keyword=keyword,
+        sort=sort,
+        order=order,
+        skip=skip,
+        limit=limit,
+    )
+    if fast_read.enabled():
+        return fast_read.rows_response(stocks)
+    return stocks
+
+
+@router.post("/stocks/batch", response_model=List[StockBatchResult])
+async def create_stock_batch(
+    entries: List[StockBatchEntry],
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    バーコード読み取り結果（barcode, location_id, delta）を一括で在庫に反映します。
+    各エントリごとの反映結果を返します。
+    """
+    results = await stock_crud.apply_stock_batch(db, entries)
+    return results
+
+
+@router.post("/stocks/{stock_id}/adjust", response_model=Stock)
+async def adjust_stock(
+    stock_id: int,
+    adjust: StockAdjust,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    在庫数を delta だけ増減します（0未満になる場合は409）。
+    If-Match にバージョン（ETag）を指定した場合は一致するときだけ更新します（不一致は412）。
+    """
+    expected_version = None
+    if if_match is not None and if_match.strip() != "*":
+        try:
+            expected_version = int(if_match.strip().removeprefix("W/").strip('"'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid If-Match header")
+    stock = await stock_crud.adjust_stock(db, stock_id, adjust.delta, expected_version=expected_version)
+    response.headers["ETag"] = f'"{stock.version}"'
+    return stock
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_read_db
+from app.schemas import SyncResponse
+from app.service import fast_read
+from app.service import sync as sync_service
+
+router = APIRouter()
+
+@router.get("/sync", response_model=SyncResponse)
+async def read_changes(
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    since（前回のレスポンスの watermark）以降に変更されたカテゴリ・アイテム・ロケーション・在庫と、
+    削除された行のIDを返します。since を省略すると全件を返します。
+    """
+    changes = await sync_service.get_changes(db, since=since)
+    if fast_read.enabled():
+        for key, _, _ in sync_service.SYNC_TABLES:
+            changes[key] = [row._asdict() for row in changes[key]]
+        return ORJSONResponse(changes)
+    return SyncResponse(**{
+        **changes,
+        **{key: [dict(row._mapping) for row in changes[key]] for key, _, _ in sync_service.SYNC_TABLES},
+    })
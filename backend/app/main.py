@@ -1,53 +1,113 @@
-from fastapi import FastAPI, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from importlib import import_module
+from typing import Optional, Sequence
 import os
-from dotenv import load_dotenv
-import uvicorn
 
-from app.db.database import engine
+# エンドポイントルーター（app.endpoints 以下のモジュール名, タグ）
+# モジュールは create_app() で使うものだけをインポートする
+ROUTERS = [
+    ("root", "root"),
+    ("items", "items"),
+    ("stocks", "stocks"),
+    ("categories", "categories"),
+    ("locations", "locations"),
+    ("export", "export"),
+    ("imports", "import"),
+    ("history", "history"),
+    ("metrics", "metrics"),
+    ("sync", "sync"),
+    ("dashboard", "dashboard"),
+    ("floor", "floor"),
+    ("forecast", "forecast"),
+]
 
-from app.models.item import Item
-from app.models.stock import Stock
-from app.models.category import Category
-from app.models.location import Location
-from app.endpoints import root, categories, items, stocks, locations
-
-# 環境変数の読み込み
-load_dotenv()
+base_path = "/v1"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    
+    from app.db.database import dispose_engines, init_engines, warm_up_pool
+    from app.monitoring.instrumentation import instrument_engine
+    from app.service.jobs import scheduler
+    from app.service.stock_events import broker
+
+    # 起動処理（エンジンの作成とSQLの計測、コネクションプールの事前確立）
+    for target in init_engines().values():
+        instrument_engine(target)
+    await warm_up_pool()
+    # 在庫変更通知の LISTEN を開始
+    broker.start()
+    # 定期ジョブのスケジューラを開始
+    scheduler.start()
+
     yield
-    
+
     # シャットダウン処理
-    await engine.dispose()
-
-app = FastAPI(
-    title="Home Inventory Manager",
-    description="API for managing home inventory",
-    version="0.1.0",
-    lifespan=lifespan,
-)
-
-# CORSミドルウェアの設定
-origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:8080").split(",")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    await scheduler.stop()
+    await broker.stop()
+    await dispose_engines()
 
-base_path = "/v1"
+def create_app(routers: Optional[Sequence[str]] = None) -> FastAPI:
+    """
+    アプリケーションを作成する。
+    DBエンジンはインポート時ではなく lifespan の起動処理で作成する。
+    routers を指定した場合はそのルーター（ROUTERS のモジュール名）だけを読み込む（テストやベンチマーク用）。
+    OPENAPI_SCHEMA_PATH に事前生成したスキーマ（python -m app.openapi）があれば、それを読み込んで使う。
+    """
+    # 環境変数の読み込み（設定を読むモジュールのインポートより先に行う）
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from app.middleware import CompressionMiddleware, ETagMiddleware
+    from app.monitoring.instrumentation import MetricsMiddleware, register_pool_metrics, register_scheduler_metrics
+    from app.openapi import load_openapi
+    from app.service.jobs import scheduler
+
+    app = FastAPI(
+        title="Home Inventory Manager",
+        description="API for managing home inventory",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+
+    register_pool_metrics()
+    register_scheduler_metrics(scheduler)
+
+    # 一覧のETag付与とレスポンス圧縮（ETagは圧縮方式を付け足すため内側に置く）
+    app.add_middleware(ETagMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024)))
+
+    # レイテンシ・SQL計測ミドルウェアの設定
+    app.add_middleware(MetricsMiddleware)
+
+    # CORSミドルウェアの設定
+    origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:8080").split(",")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # エンドポイントルーターをアプリケーションに登録
+    known = dict(ROUTERS)
+    for name in routers if routers is not None else known:
+        if name not in known:
+            raise ValueError(f"Unknown router: {name}")
+        module = import_module(f"app.endpoints.{name}")
+        app.include_router(module.router, prefix=f"{base_path}", tags=[known[name]])
+
+    # 一部のルーターだけのアプリでは事前生成したスキーマと内容が合わないため使わない
+    if routers is None:
+        load_openapi(app)
+    return app
 
-# エンドポイントルーターをアプリケーションに登録
-app.include_router(root.router, prefix=f"{base_path}", tags=["root"])
-app.include_router(items.router, prefix=f"{base_path}", tags=["items"])
-app.include_router(stocks.router, prefix=f"{base_path}", tags=["stocks"])
-app.include_router(categories.router, prefix=f"{base_path}", tags=["categories"])
-app.include_router(locations.router, prefix=f"{base_path}", tags=["locations"])
+def __getattr__(name: str):
+    # uvicorn app.main:app 用。app はインポート時ではなく最初に参照されたときに作成する
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
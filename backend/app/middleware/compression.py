@@ -0,0 +1,119 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli が無い環境では gzip のみ
+    brotli = None
+
+# 圧縮しない Content-Type（SSE はバッファリングされると配信が止まる）
+SKIP_CONTENT_TYPES = ("text/event-stream",)
+
+
+def _choose_encoding(accept_encoding: str):
+    accepted = {value.split(";")[0].strip() for value in accept_encoding.lower().split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """gzip / brotli のストリーミング圧縮を同じ形で扱う"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Accept-Encoding に応じてレスポンスを brotli / gzip で圧縮する。
+    minimum_size 未満の単一ボディは圧縮せず、ストリーミングはチャンクごとに圧縮して送る。
+    ETag は表現ごとに区別できるよう末尾に圧縮方式を付ける。
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        level = self.brotli_quality if encoding == "br" else self.gzip_level
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or content_type.startswith(SKIP_CONTENT_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # 最初のボディを見るまで圧縮するかどうか決められないので保留する
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                initial, start_message = start_message, None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(initial)
+                    await send(message)
+                    return
+                headers = MutableHeaders(scope=initial)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag is not None and etag.endswith('"'):
+                    headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+                compressor = _Compressor(encoding, level)
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(initial)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(initial)
+
+            chunk = compressor.compress(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,27 @@
+from starlette.datastructures import MutableHeaders
+
+
+class ETagMiddleware:
+    """
+    conditional_get が request.state に設定したETagを 200 のレスポンスに付与する。
+    エンドポイントが ORJSONResponse を直接返す場合でもヘッダーを付けられるようにミドルウェアで行う。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                if etag is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers["ETag"] = etag
+                    headers["Cache-Control"] = "no-cache"
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
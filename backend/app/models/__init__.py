@@ -1,4 +1,10 @@
+from app.models.household import Household
 from app.models.item import Item
 from app.models.category import Category
 from app.models.location import Location
-from app.models.stock import Stock
\ No newline at end of file
+from app.models.stock import Stock
+from app.models.item_stock_total import ItemStockTotal
+from app.models.stock_movement import StockMovement, StockSnapshot
+from app.models.sync_tombstone import SyncTombstone
+from app.models.table_change import TableChange
+from app.models.item_forecast import ItemForecast
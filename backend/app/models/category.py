@@ -1,16 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.models.household import HouseholdScoped
 
-class Category(Base):
+class Category(HouseholdScoped, Base):
     """カテゴリモデル"""
     __tablename__ = "categories"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(50), nullable=False, unique=True)
+    name = Column(String(50), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # リレーションシップ
-    items = relationship("Item", back_populates="category") 
\ No newline at end of file
+    items = relationship("Item", back_populates="category", primaryjoin="foreign(Item.category_id) == Category.id")
+
+    __table_args__ = (
+        # カテゴリ名は世帯ごとに一意
+        UniqueConstraint("household_id", "name", name="uq_categories_household_id_name"),
+        # 世帯をまたいだ参照を防ぐ複合外部キーの参照先
+        UniqueConstraint("household_id", "id", name="uq_categories_household_id_id"),
+    )
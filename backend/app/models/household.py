@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy.orm import declared_attr
+
+from app.db.base import Base
+
+class Household(Base):
+    """世帯（テナント）モデル"""
+    __tablename__ = "households"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class HouseholdScoped:
+    """
+    世帯ごとに分離されるモデルの mixin。
+    セッションに世帯が設定されている場合、SELECT / UPDATE / DELETE は自動でその世帯に絞り込まれ、
+    追加する行には世帯IDが設定される（app.db.tenancy を参照）。
+    """
+
+    @declared_attr
+    def household_id(cls):
+        return Column(Integer, ForeignKey("households.id"), nullable=False)
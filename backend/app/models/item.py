@@ -1,20 +1,37 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, ForeignKeyConstraint, Index, UniqueConstraint, func, literal_column
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.models.household import HouseholdScoped
 
-class Item(Base):
-    """アイテムモデル"""
+class Item(HouseholdScoped, Base):
+    """アイテムモデル（世帯IDでハッシュパーティション分割）"""
     __tablename__ = "items"
     
-    id = Column(Integer, primary_key=True, index=True)
-    barcode = Column(String(13), nullable=True, unique=True)
+    # パーティションキーは主キーに含める必要がある（ORM上の識別は id のみ）
+    household_id = Column(Integer, ForeignKey("households.id"), primary_key=True)
+    id = Column(Integer, primary_key=True)
+    barcode = Column(String(13), nullable=True)
     name = Column(String(100), nullable=True, index=True)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    category_id = Column(Integer, nullable=True)
     min_threshold = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    # リレーションシップ
-    stocks = relationship("Stock", back_populates="item")
-    category = relationship("Category", back_populates="items") 
\ No newline at end of file
+    # リレーションシップ（世帯の絞り込みはセッション側で行うため、結合条件は id のみ）
+    stocks = relationship("Stock", back_populates="item", primaryjoin="foreign(Stock.item_id) == Item.id")
+    category = relationship("Category", back_populates="items", primaryjoin="foreign(Item.category_id) == Category.id")
+
+    __table_args__ = (
+        ForeignKeyConstraint(["household_id", "category_id"], ["categories.household_id", "categories.id"]),
+        # バーコードは世帯ごとに一意
+        UniqueConstraint("household_id", "barcode", name="uq_items_household_id_barcode"),
+        # キーセットページネーション用 (name, id)
+        Index("ix_items_name_id", household_id, func.coalesce(name, literal_column("''")), id),
+        # 商品名のあいまい検索・部分一致用（pg_trgm）
+        Index("ix_items_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # 差分同期用
+        Index("ix_items_updated_at", household_id, updated_at),
+        {"postgresql_partition_by": "HASH (household_id)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKeyConstraint, Index, func
+
+from app.db.base import Base
+from app.models.household import HouseholdScoped
+
+class ItemForecast(HouseholdScoped, Base):
+    """アイテムごとの消費ペースと在庫切れ予測（予測ジョブで全件を作り直す）"""
+    __tablename__ = "item_forecasts"
+
+    item_id = Column(Integer, primary_key=True)
+    # 1日あたりの消費量（指数平滑）
+    daily_rate = Column(Float, nullable=False)
+    current_total = Column(Integer, nullable=False)
+    min_threshold = Column(Integer, nullable=False)
+    # 消費が無いアイテムは NULL（在庫切れにならない）
+    days_to_threshold = Column(Float, nullable=True)
+    days_to_depletion = Column(Float, nullable=True)
+    depletes_on = Column(Date, nullable=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        ForeignKeyConstraint(["household_id", "item_id"], ["items.household_id", "items.id"], ondelete="CASCADE"),
+        Index("ix_item_forecasts_days_to_depletion", days_to_depletion, item_id),
+        Index("ix_item_forecasts_days_to_threshold", days_to_threshold, item_id),
+    )
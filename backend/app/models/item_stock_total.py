@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKeyConstraint, Index, func, text
+
+from app.db.base import Base
+from app.models.household import HouseholdScoped
+
+class ItemStockTotal(HouseholdScoped, Base):
+    """アイテムごとの在庫合計（stocks / items のトリガーで差分更新される集計テーブル）"""
+    __tablename__ = "item_stock_totals"
+
+    item_id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    # 部分インデックスで在庫不足を判定するため items.min_threshold を複製して持つ
+    min_threshold = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        ForeignKeyConstraint(["household_id", "item_id"], ["items.household_id", "items.id"], ondelete="CASCADE"),
+        # 在庫不足のアイテムだけを含む部分インデックス
+        Index("ix_item_stock_totals_low", item_id, postgresql_where=text("total < min_threshold")),
+    )
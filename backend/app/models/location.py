@@ -1,16 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.models.household import HouseholdScoped
 
-class Location(Base):
+class Location(HouseholdScoped, Base):
     """ロケーションモデル"""
     __tablename__ = "locations"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(50), nullable=False, index=True, unique=True)
+    name = Column(String(50), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # リレーションシップ
-    stocks = relationship("Stock", back_populates="location") 
\ No newline at end of file
+    stocks = relationship("Stock", back_populates="location", primaryjoin="foreign(Stock.location_id) == Location.id")
+
+    __table_args__ = (
+        # ロケーション名は世帯ごとに一意
+        UniqueConstraint("household_id", "name", name="uq_locations_household_id_name"),
+        # 世帯をまたいだ参照を防ぐ複合外部キーの参照先
+        UniqueConstraint("household_id", "id", name="uq_locations_household_id_id"),
+    )
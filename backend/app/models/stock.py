@@ -1,19 +1,36 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from sqlalchemy import CheckConstraint, Column, Integer, DateTime, ForeignKey, ForeignKeyConstraint, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.models.household import HouseholdScoped
 
-class Stock(Base):
-    """在庫モデル"""
+class Stock(HouseholdScoped, Base):
+    """在庫モデル（世帯IDでハッシュパーティション分割）"""
     __tablename__ = "stocks"
     
-    id = Column(Integer, primary_key=True, index=True)
-    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
-    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
+    # パーティションキーは主キーに含める必要がある（ORM上の識別は id のみ）
+    household_id = Column(Integer, ForeignKey("households.id"), primary_key=True)
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)
     quantity = Column(Integer, nullable=False, default=0)
+    # 楽観的排他制御用のバージョン（在庫を更新するたびに +1）
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     
-    # リレーションシップ
-    item = relationship("Item", back_populates="stocks")
-    location = relationship("Location", back_populates="stocks") 
\ No newline at end of file
+    # リレーションシップ（世帯の絞り込みはセッション側で行うため、結合条件は id のみ）
+    item = relationship("Item", back_populates="stocks", primaryjoin="foreign(Stock.item_id) == Item.id")
+    location = relationship("Location", back_populates="stocks", primaryjoin="foreign(Stock.location_id) == Location.id")
+
+    __table_args__ = (
+        ForeignKeyConstraint(["household_id", "item_id"], ["items.household_id", "items.id"]),
+        ForeignKeyConstraint(["household_id", "location_id"], ["locations.household_id", "locations.id"]),
+        # キーセットページネーション用 (updated_at, id)
+        Index("ix_stocks_updated_at_id", household_id, updated_at, id),
+        # 一括入出庫の upsert (ON CONFLICT) 用
+        UniqueConstraint("household_id", "item_id", "location_id", name="uq_stocks_household_id_item_id_location_id"),
+        CheckConstraint("quantity >= 0", name="ck_stocks_quantity_non_negative"),
+        {"postgresql_partition_by": "HASH (household_id)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
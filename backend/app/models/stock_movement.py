@@ -0,0 +1,36 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index, func
+
+from app.db.base import Base
+from app.models.household import HouseholdScoped
+
+class StockMovement(HouseholdScoped, Base):
+    """在庫の増減履歴（stocks のトリガーで追記される。created_at で月ごとにパーティション分割）"""
+    __tablename__ = "stock_movements"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    item_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)
+    delta = Column(Integer, nullable=False)
+    quantity_after = Column(Integer, nullable=False)
+    reason = Column(String(20), nullable=False)
+    # パーティションキーは主キーに含める必要がある
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_stock_movements_item_id_created_at", "item_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+class StockSnapshot(HouseholdScoped, Base):
+    """ある時点の在庫数のスナップショット（履歴の集約ジョブで作成される）"""
+    __tablename__ = "stock_snapshots"
+
+    id = Column(BigInteger, primary_key=True)
+    taken_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    item_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)
+    quantity = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_snapshots_item_id_taken_at", "item_id", "taken_at"),
+    )
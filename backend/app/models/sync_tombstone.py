@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, func
+
+from app.db.base import Base
+from app.models.household import HouseholdScoped
+
+class SyncTombstone(HouseholdScoped, Base):
+    """差分同期用の削除記録（各テーブルの削除トリガーで追記される）"""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, func
+
+from app.db.base import Base
+from app.models.household import HouseholdScoped
+
+class TableChange(HouseholdScoped, Base):
+    """
+    世帯・テーブルごとの変更記録（各テーブルの文単位トリガーが、変更された行の世帯ごとに1行追記する）。
+    追記だけなので書き込みどうしは競合しない。weight の合計がその世帯・テーブルの版数になり、
+    定期ジョブが古い行を合計を保ったまま1行にまとめる。
+    """
+    __tablename__ = "table_changes"
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    weight = Column(BigInteger, nullable=False, server_default="1")
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # 版数の集計を index-only scan で行う
+        Index("ix_table_changes_household_id_table_name", "household_id", "table_name", postgresql_include=["weight"]),
+    )
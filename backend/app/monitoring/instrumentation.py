@@ -0,0 +1,172 @@
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.database import get_pool_stats
+from app.monitoring.metrics import (
+    Gauge,
+    N_PLUS_ONE,
+    QUERY_LATENCY,
+    REQUEST_DB_TIME,
+    REQUEST_LATENCY,
+    REQUEST_QUERIES,
+    SLOW_REQUESTS,
+    registry,
+)
+
+logger = logging.getLogger("app.slow_request")
+
+# 同じSQLがこの回数以上実行されたリクエストを N+1 とみなす
+N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", 10))
+# 遅いリクエストの閾値（秒）と、SQL付きでログに出す割合
+SLOW_REQUEST_SECONDS = float(os.getenv("METRICS_SLOW_REQUEST_SECONDS", 1.0))
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv("METRICS_SLOW_REQUEST_SAMPLE_RATE", 0.1))
+# 1リクエストで保持するSQLの上限（ログ出力用）
+MAX_RECORDED_STATEMENTS = 100
+
+class RequestStats:
+    """1リクエスト内で実行されたSQLの集計"""
+
+    __slots__ = ("queries", "db_time", "statement_counts", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statement_counts: Dict[str, int] = {}
+        self.statements: List[Tuple[str, float]] = []
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    QUERY_LATENCY.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_time += elapsed
+    stats.statement_counts[statement] = stats.statement_counts.get(statement, 0) + 1
+    if len(stats.statements) < MAX_RECORDED_STATEMENTS:
+        stats.statements.append((statement, elapsed))
+
+def _handle_error(exception_context):
+    # 失敗したSQLは after_cursor_execute が呼ばれないため開始時刻を破棄する
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """SQLの実行回数・時間を計測するイベントを登録する（登録済みのエンジンには何もしない）"""
+    if event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+def register_scheduler_metrics(scheduler) -> None:
+    """スケジューラのジョブの実行回数・所要時間のメトリクスを登録する（job ラベル）"""
+    job_metrics = [
+        ("scheduler_job_runs_total", "Scheduled job runs", "runs", "counter"),
+        ("scheduler_job_failures_total", "Scheduled job failures", "failures", "counter"),
+        ("scheduler_job_skipped_total", "Scheduled runs skipped because this worker is not the leader", "skipped", "counter"),
+        ("scheduler_job_duration_seconds_total", "Time spent running scheduled jobs", "total_duration_seconds", "counter"),
+        ("scheduler_job_last_duration_seconds", "Duration of the last run", "last_duration_seconds", "gauge"),
+        ("scheduler_job_max_duration_seconds", "Longest run", "max_duration_seconds", "gauge"),
+    ]
+    for name, documentation, key, metric_type in job_metrics:
+        registry.register(Gauge(
+            name,
+            documentation,
+            lambda key=key: {(job_name,): getattr(job.stats, key) for job_name, job in scheduler.jobs.items()},
+            metric_type,
+            labelnames=("job",),
+        ))
+    registry.register(Gauge("scheduler_leader", "1 if this worker holds the scheduler lock", lambda: int(scheduler.is_leader)))
+
+def register_pool_metrics() -> None:
+    """コネクションプールのメトリクスを登録する（pool ラベルは write / read）"""
+
+    pool_metrics = [
+        ("db_pool_size", "Configured pool size", "size", "gauge"),
+        ("db_pool_checked_in", "Idle connections in the pool", "checked_in", "gauge"),
+        ("db_pool_checked_out", "Connections currently in use", "checked_out", "gauge"),
+        ("db_pool_overflow", "Overflow connections currently open", "overflow", "gauge"),
+        ("db_pool_checkout_total", "Connection checkouts", "checkout_count", "counter"),
+        ("db_pool_checkout_wait_seconds_total", "Time spent waiting for a connection", "checkout_wait_seconds", "counter"),
+        ("db_pool_checkout_wait_max_seconds", "Longest wait for a connection", "checkout_wait_max_seconds", "gauge"),
+    ]
+    def collect(key):
+        return {(role,): stats[key] for role, stats in get_pool_stats()["pools"].items()}
+
+    for name, documentation, key, metric_type in pool_metrics:
+        registry.register(Gauge(name, documentation, lambda key=key: collect(key), metric_type, labelnames=("pool",)))
+
+class MetricsMiddleware:
+    """ルートごとのレイテンシと、リクエストごとのSQL実行回数・時間を記録するASGIミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[object, str] = {}
+
+    def _route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            router = scope.get("router")
+            routes = getattr(router, "routes", [])
+            path = next((route.path for route in routes if getattr(route, "endpoint", None) is endpoint), "unmatched")
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            self._record(scope, status["code"], elapsed, stats)
+
+    def _record(self, scope, status_code: int, elapsed: float, stats: RequestStats) -> None:
+        route = self._route_path(scope)
+        REQUEST_LATENCY.observe(elapsed, scope["method"], route, str(status_code))
+        REQUEST_QUERIES.observe(stats.queries, route)
+        REQUEST_DB_TIME.observe(stats.db_time, route)
+
+        repeated = max(stats.statement_counts.values(), default=0)
+        if repeated >= N_PLUS_ONE_THRESHOLD:
+            N_PLUS_ONE.inc(route)
+            logger.warning("possible N+1: %s %s repeated one statement %d times", scope["method"], route, repeated)
+
+        if elapsed >= SLOW_REQUEST_SECONDS:
+            SLOW_REQUESTS.inc(route)
+            if random.random() < SLOW_REQUEST_SAMPLE_RATE:
+                statements = "\n".join(f"  [{duration * 1000:.1f}ms] {sql}" for sql, duration in stats.statements)
+                logger.warning(
+                    "slow request: %s %s %.3fs, %d queries, db %.3fs\n%s",
+                    scope["method"], scope["path"], elapsed, stats.queries, stats.db_time, statements,
+                )
@@ -0,0 +1,153 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Prometheus テキスト形式のメトリクス（外部ライブラリを使わない最小実装）
+# 値はワーカープロセス単位で保持する
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+class Gauge:
+    """
+    描画時に collect() で値を取得するメトリクス（累積値は metric_type="counter"）。
+    labelnames を指定した場合、collect() は {ラベル値のタプル: 値} を返す。
+    """
+
+    def __init__(self, name: str, documentation: str, collect, metric_type: str = "gauge", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        if not self.labelnames:
+            lines.append(f"{self.name} {_format_value(self._collect())}")
+            return lines
+        for labelvalues, value in sorted(self._collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # ラベルごとに [バケットごとの件数..., 合計値, 件数]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                labels = _format_labels(self.labelnames, labelvalues, le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        """メトリクスを登録する（同名のメトリクスは置き換える。アプリを作り直しても重複しない）"""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_db_queries",
+    "Number of SQL statements executed per request",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+))
+REQUEST_DB_TIME = registry.register(Histogram(
+    "http_request_db_duration_seconds",
+    "Total SQL execution time per request",
+    ("route",),
+))
+QUERY_LATENCY = registry.register(Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+))
+N_PLUS_ONE = registry.register(Counter(
+    "http_request_n_plus_one_total",
+    "Requests that repeated one SQL statement more than the N+1 threshold",
+    ("route",),
+))
+SLOW_REQUESTS = registry.register(Counter(
+    "http_request_slow_total",
+    "Requests slower than the slow request threshold",
+    ("route",),
+))
@@ -0,0 +1,44 @@
+# python -m app.openapi [出力先]
+# OpenAPIスキーマを事前に生成してファイルに書き出す（本番イメージのビルド時に実行する）
+# OPENAPI_SCHEMA_PATH を設定すると、起動時にスキーマを生成せずこのファイルを読み込む
+
+import json
+import os
+import sys
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+DEFAULT_OPENAPI_SCHEMA_PATH = "openapi.json"
+
+def _schema_paths(app: FastAPI) -> set:
+    return {route.path_format for route in app.routes if isinstance(route, APIRoute) and route.include_in_schema}
+
+def load_openapi(app: FastAPI, path: Optional[str] = None) -> bool:
+    """
+    事前生成したスキーマを app.openapi_schema に設定する。
+    バージョンかパスの一覧がアプリと合わない（古い）場合は使わず、従来どおり初回の /openapi.json で生成する。
+    """
+    path = path or os.getenv("OPENAPI_SCHEMA_PATH")
+    if not path or not os.path.exists(path):
+        return False
+    with open(path, encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("info", {}).get("version") != app.version or set(schema.get("paths", {})) != _schema_paths(app):
+        return False
+    app.openapi_schema = schema
+    return True
+
+def build_openapi(path: str = DEFAULT_OPENAPI_SCHEMA_PATH) -> None:
+    """アプリを作成してスキーマを生成し、path に書き出す（DBには接続しない）"""
+    from app.main import create_app
+
+    schema = create_app().openapi()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, separators=(",", ":"))
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else os.getenv("OPENAPI_SCHEMA_PATH", DEFAULT_OPENAPI_SCHEMA_PATH)
+    build_openapi(output)
+    print(f"✅ OpenAPIスキーマを書き出しました: {output}")
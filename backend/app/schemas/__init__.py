@@ -1,4 +1,10 @@
 from .category import Category
-from .item import Item
+from .item import Item, ItemPage, ItemSearchResult, LowStockItem
 from .location import Location
-from .stock import Stock
\ No newline at end of file
+from .stock import Stock, StockPage, StockView, StockAdjust, StockBatchEntry, StockBatchResult
+from .imports import ImportReport
+from .stock_movement import StockMovement, StockAtTime
+from .sync import SyncResponse
+from .dashboard import DashboardGroup, DashboardSummary
+from .floor import RoomOccupancy, FloorOccupancy
+from .forecast import ItemForecast
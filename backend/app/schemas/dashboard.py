@@ -0,0 +1,20 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class DashboardGroup(BaseModel):
+    """ロケーション・カテゴリごと（または全体）の集計値"""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    item_count: int
+    stock_rows: int
+    total_quantity: int
+    low_stock_items: int
+
+
+class DashboardSummary(BaseModel):
+    """ダッシュボードの集計（by_category の id=null は未分類）"""
+    totals: DashboardGroup
+    by_location: List[DashboardGroup]
+    by_category: List[DashboardGroup]
+    generated_at: datetime
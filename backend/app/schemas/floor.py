@@ -0,0 +1,16 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class RoomOccupancy(BaseModel):
+    """間取り図の部屋ごとの在庫集計（location_id が null の部屋は対応するロケーションが無い）"""
+    room_id: str
+    name: str
+    location_id: Optional[int] = None
+    item_count: int
+    total_quantity: int
+    low_stock_items: int
+    low_stock: bool
+
+
+class FloorOccupancy(BaseModel):
+    rooms: List[RoomOccupancy]
@@ -0,0 +1,17 @@
+from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel
+
+class ItemForecast(BaseModel):
+    """アイテムの在庫切れ予測（days_to_* が null のアイテムは消費が無い）"""
+    item_id: int
+    daily_rate: float
+    current_total: int
+    min_threshold: int
+    days_to_threshold: Optional[float] = None
+    days_to_depletion: Optional[float] = None
+    depletes_on: Optional[date] = None
+    computed_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+class ImportReport(BaseModel):
+    """一括インポートの結果"""
+    rows: int
+    skipped: int
+    categories: int
+    items: int
+    locations: int
+    stocks: int
+    elapsed_seconds: float
+    rows_per_second: float
@@ -1,10 +1,10 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, constr
+from typing import List, Optional
 from datetime import datetime
 
 class Item(BaseModel):
     id: Optional[int] = None
-    barcode: Optional[int] = None
+    barcode: Optional[constr(max_length=13)] = None
     name: Optional[str] = None
     category_id: Optional[int] = None
     min_threshold: int = 1
@@ -12,4 +12,19 @@ class Item(BaseModel):
     updated_at: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ItemPage(BaseModel):
+    """キーセットページネーションのレスポンス"""
+    items: List[Item]
+    next_cursor: Optional[str] = None
+
+
+class ItemSearchResult(Item):
+    """商品名検索の結果（score は類似度）"""
+    score: float
+
+
+class LowStockItem(Item):
+    """在庫不足のアイテム（total は全ロケーションの在庫合計）"""
+    total: int
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, constr
 from datetime import datetime
 
 class Stock(BaseModel):
@@ -6,8 +7,52 @@ class Stock(BaseModel):
     item_id: int
     location_id: int
     quantity: int
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class StockPage(BaseModel):
+    """キーセットページネーションのレスポンス"""
+    items: List[Stock]
+    next_cursor: Optional[str] = None
+
+class StockView(BaseModel):
+    """在庫一覧表示用（商品・カテゴリ・ロケーションを結合済み）"""
+    id: int
+    item_id: int
+    location_id: Optional[int] = None
+    itemName: Optional[str] = None
+    locationName: Optional[str] = None
+    categoryName: Optional[str] = None
+    quantity: int
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class StockAdjust(BaseModel):
+    """在庫数の増減"""
+    delta: int
+
+class StockBatchEntry(BaseModel):
+    """バーコード読み取り1件分の入出庫"""
+    barcode: constr(min_length=1, max_length=13)
+    location_id: int
+    delta: int
+
+class StockBatchResult(BaseModel):
+    """
+    一括入出庫の1件ごとの結果
+    status: applied / no_change / insufficient_stock（在庫不足で未反映）/ no_stock / unknown_barcode / unknown_location
+    """
+    index: int
+    barcode: str
+    location_id: int
+    delta: int
+    status: str
+    stock_id: Optional[int] = None
+    quantity: Optional[int] = None
@@ -0,0 +1,23 @@
+from typing import Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+class StockMovement(BaseModel):
+    id: int
+    item_id: int
+    location_id: Optional[int] = None
+    delta: int
+    quantity_after: int
+    reason: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class StockAtTime(BaseModel):
+    """ある時点のロケーションごとの在庫数"""
+    location_id: Optional[int] = None
+    quantity: int
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,18 @@
+from typing import Dict, List
+from datetime import datetime
+from pydantic import BaseModel
+
+from .category import Category
+from .item import Item
+from .location import Location
+from .stock import Stock
+
+class SyncResponse(BaseModel):
+    """差分同期のレスポンス（次回は watermark を since に指定する）"""
+    watermark: datetime
+    full: bool
+    categories: List[Category]
+    items: List[Item]
+    locations: List[Location]
+    stocks: List[Stock]
+    deleted: Dict[str, List[int]]
@@ -1,4 +1,4 @@
 from app.service.item import get_items
-from app.service.stock import get_stocks
+from app.service.stock import get_stocks, get_stock_view
 from app.service.category import get_categories
-from app.service.location import get_locations
\ No newline at end of file
+from app.service.location import get_locations
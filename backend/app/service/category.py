@@ -3,11 +3,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.models.category import Category
+from app.schemas.category import Category as CategorySchema
+from app.service.fast_read import columns_for
+
+# 高速パスで取得する列
+CATEGORY_COLUMNS = columns_for(Category, CategorySchema)
 
 # カテゴリの取得（全件）
-async def get_categories(db: AsyncSession) -> List[Category]:
-    """すべてのカテゴリを取得する"""
-    query = select(Category)
+async def get_categories(db: AsyncSession, as_rows: bool = False) -> List[Category]:
+    """すべてのカテゴリを取得する（as_rows=True の場合はORMを経由せず行のまま返す）"""
+    query = select(*CATEGORY_COLUMNS) if as_rows else select(Category)
     result = await db.execute(query)
-    categories = result.scalars().all()
+    categories = result.all() if as_rows else result.scalars().all()
     return categories   
@@ -0,0 +1,105 @@
+import hashlib
+from typing import Dict, Optional, Sequence, Set
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.database import get_read_db
+from app.db.tenancy import get_household, household_from_request
+from app.middleware.compression import _choose_encoding
+from app.models.table_change import TableChange
+from app.service import expand, fast_read
+
+# 古い変更記録を、合計を保ったまま1行にまとめる（1行しか無い世帯・テーブルは書き換えない）
+# 実行中に追記された行は DELETE から見えないため残り、合計は変わらない
+COMPACT_TABLE_CHANGES_SQL = """
+WITH folded AS (
+    DELETE FROM table_changes c
+    USING (
+        SELECT household_id, table_name FROM table_changes
+        GROUP BY household_id, table_name HAVING count(*) > 1
+    ) g
+    WHERE c.household_id = g.household_id AND c.table_name = g.table_name
+    RETURNING c.household_id, c.table_name, c.weight
+)
+INSERT INTO table_changes (household_id, table_name, weight)
+SELECT household_id, table_name, sum(weight) FROM folded GROUP BY household_id, table_name
+"""
+
+async def get_table_versions(db: AsyncSession, tables: Sequence[str]) -> Dict[str, int]:
+    """
+    指定テーブルのセッションの世帯での変更版数を取得する（変更記録の weight の合計）。
+    コミットごとに記録が1行以上増えるため、コミットの順序によらず版数は必ず変わる。
+    """
+    result = await db.execute(
+        select(TableChange.table_name, func.sum(TableChange.weight))
+        .where(TableChange.household_id == get_household(db), TableChange.table_name.in_(tables))
+        .group_by(TableChange.table_name)
+    )
+    versions = {table: int(version) for table, version in result.all()}
+    return {table: versions.get(table, 0) for table in tables}
+
+async def compact_table_changes(db: AsyncSession) -> int:
+    """変更記録をまとめ、まとめた後の行数を返す"""
+    result = await db.execute(text(COMPACT_TABLE_CHANGES_SQL))
+    await db.commit()
+    return result.rowcount
+
+def make_etag(request: Request, versions: Dict[str, int]) -> str:
+    """パス・クエリ・世帯・テーブルの版数から強いETagを作る"""
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    key = f"{request.url.path}?{query}|{household_from_request(request)}|{int(fast_read.enabled())}"
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    version = ".".join(str(versions[table]) for table in sorted(versions))
+    return f'"{version}-{digest}"'
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _representation_tags(request: Request, etag: str) -> Set[str]:
+    """このリクエストへの 200 に付き得るETag（未圧縮と、Accept-Encoding で選ばれる圧縮方式の表現）"""
+    tags = {etag}
+    encoding = _choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None:
+        tags.add(f'{etag[:-1]}-{encoding}"')
+    return tags
+
+def if_none_match(request: Request, etag: str) -> Optional[str]:
+    """
+    If-None-Match がこのリクエストの表現のETagに一致すれば、304 で返すETagを返す（一致しなければ None）。
+    圧縮の有無は本文の大きさで決まるため、クライアントが持つ表現のETag（圧縮方式付き）をそのまま返す。
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    tags = _representation_tags(request, etag)
+    for tag in header.split(","):
+        tag = _strip_weak(tag)
+        if tag in tags:
+            return tag
+    return None
+
+def conditional_get(*tables: str, expand_model=None):
+    """
+    一覧系エンドポイント用の依存関数を返す。
+    If-None-Match が現在のETagと一致すれば一覧のクエリを実行せずに 304 を返し、
+    そうでなければETagを request.state に設定する（ヘッダーへの付与は ETagMiddleware が行う）。
+    expand_model を指定した場合は include で展開するテーブルの版数もETagに含める。
+    """
+    async def dependency(request: Request, db: AsyncSession = Depends(get_read_db)) -> str:
+        targets = set(tables)
+        if expand_model is not None:
+            targets |= expand.tables_for(expand_model, expand.parse_include(expand_model, request.query_params.get("include")))
+        versions = await get_table_versions(db, sorted(targets))
+        etag = make_etag(request, versions)
+        matched = if_none_match(request, etag)
+        if matched is not None:
+            raise HTTPException(status_code=304, headers={"ETag": matched, "Cache-Control": "no-cache"})
+        request.state.etag = etag
+        return etag
+    return dependency
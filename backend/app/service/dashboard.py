@@ -0,0 +1,80 @@
+import asyncio
+import os
+import weakref
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.tenancy import get_household
+from app.service.cache import LRUCache, MISSING
+from app.service.conditional import get_table_versions
+
+# 集計結果は世帯とテーブルの変更版数をキーにキャッシュする（版数が同じでも ttl 秒で作り直す）
+DASHBOARD_TABLES = ("categories", "items", "locations", "stocks")
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", 60))
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", 256))
+summary_cache = LRUCache(maxsize=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL)
+# 同時に期限切れになったときに同じ世帯の集計クエリが重複して走らないようにする
+# ロックは世帯ごとに、実行中のイベントループの中で作る（使われなくなったロックは自動で消える）
+_summary_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _summary_lock(household_id: int) -> asyncio.Lock:
+    lock = _summary_locks.get(household_id)
+    if lock is None:
+        lock = _summary_locks[household_id] = asyncio.Lock()
+    return lock
+
+# ロケーション別・カテゴリ別・全体の3つの集計を1回の走査で求める（世帯のパーティションだけを読む）
+SUMMARY_SQL = text("""
+    SELECT
+        GROUPING(l.id, l.name) = 0 AS by_location,
+        GROUPING(c.id, c.name) = 0 AS by_category,
+        l.id AS location_id, l.name AS location_name,
+        c.id AS category_id, c.name AS category_name,
+        count(DISTINCT i.id) AS item_count,
+        count(s.id) AS stock_rows,
+        coalesce(sum(s.quantity), 0) AS total_quantity,
+        count(DISTINCT i.id) FILTER (WHERE t.total < t.min_threshold) AS low_stock_items
+    FROM items i
+    LEFT JOIN item_stock_totals t ON t.household_id = i.household_id AND t.item_id = i.id
+    LEFT JOIN categories c ON c.household_id = i.household_id AND c.id = i.category_id
+    LEFT JOIN stocks s ON s.household_id = i.household_id AND s.item_id = i.id
+    LEFT JOIN locations l ON l.household_id = s.household_id AND l.id = s.location_id
+    WHERE i.household_id = :household_id
+    GROUP BY GROUPING SETS ((l.id, l.name), (c.id, c.name), ())
+""")
+
+async def _compute_summary(db: AsyncSession) -> Dict[str, Any]:
+    result = await db.execute(SUMMARY_SQL, {"household_id": get_household(db)})
+    summary: Dict[str, Any] = {"by_location": [], "by_category": []}
+    for row in result.mappings():
+        values = {key: row[key] for key in ("item_count", "stock_rows", "total_quantity", "low_stock_items")}
+        if row["by_location"]:
+            # 在庫行の無いアイテムは location が NULL のグループに入るので除く
+            if row["location_id"] is not None:
+                summary["by_location"].append({"id": row["location_id"], "name": row["location_name"], **values})
+        elif row["by_category"]:
+            summary["by_category"].append({"id": row["category_id"], "name": row["category_name"], **values})
+        else:
+            summary["totals"] = values
+    summary["by_location"].sort(key=lambda group: group["id"])
+    summary["by_category"].sort(key=lambda group: (group["id"] is None, group["id"] or 0))
+    summary["generated_at"] = (await db.execute(text("SELECT now()"))).scalar_one()
+    return summary
+
+# ダッシュボードの集計を取得
+async def get_dashboard_summary(db: AsyncSession) -> Dict[str, Any]:
+    """各テーブルの変更版数が前回と同じで ttl 内なら、キャッシュした集計をそのまま返す"""
+    household_id = get_household(db)
+    versions = await get_table_versions(db, DASHBOARD_TABLES)
+    key = (household_id,) + tuple(versions[table] for table in DASHBOARD_TABLES)
+    summary = summary_cache.get(key)
+    if summary is not MISSING:
+        return summary
+    async with _summary_lock(household_id):
+        summary = summary_cache.get(key)
+        if summary is MISSING:
+            summary = await _compute_summary(db)
+            summary_cache.set(key, summary)
+    return summary
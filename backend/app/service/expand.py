@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Sequence, Set
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.category import Category
+from app.models.item import Item
+from app.models.location import Location
+from app.models.stock import Stock
+from app.schemas.category import Category as CategorySchema
+from app.schemas.item import Item as ItemSchema
+from app.schemas.location import Location as LocationSchema
+from app.schemas.stock import Stock as StockSchema
+
+# include で展開できるリレーションシップと、レスポンスに使うスキーマ
+RELATIONSHIPS = {
+    Item: ("category", "stocks"),
+    Stock: ("item", "location"),
+    Location: ("stocks",),
+    Category: (),
+}
+SCHEMAS = {
+    Item: ItemSchema,
+    Stock: StockSchema,
+    Location: LocationSchema,
+    Category: CategorySchema,
+}
+# 「stocks.item.category」のような展開の深さの上限
+MAX_INCLUDE_DEPTH = 3
+# ids で一度に取得できる件数の上限
+MAX_IDS = 1000
+
+IncludeTree = Dict[str, "IncludeTree"]
+
+def parse_ids(ids: Optional[str]) -> Optional[List[int]]:
+    """カンマ区切りのIDを数値のリストにする（重複は除き、指定順を保つ）"""
+    if ids is None:
+        return None
+    try:
+        values = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    values = list(dict.fromkeys(values))
+    if not values or len(values) > MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"ids must contain 1 to {MAX_IDS} values")
+    return values
+
+def _target(model, name: str):
+    return getattr(model, name).property.mapper.class_
+
+def parse_include(model, include: Optional[str]) -> IncludeTree:
+    """「category,stocks.location」を {"category": {}, "stocks": {"location": {}}} の形にする"""
+    tree: IncludeTree = {}
+    if not include:
+        return tree
+    for path in include.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        names = path.split(".")
+        if len(names) > MAX_INCLUDE_DEPTH:
+            raise HTTPException(status_code=400, detail=f"include is too deep: {path}")
+        current_model, node = model, tree
+        for name in names:
+            if name not in RELATIONSHIPS[current_model]:
+                raise HTTPException(status_code=400, detail=f"Unknown include: {path}")
+            node = node.setdefault(name, {})
+            current_model = _target(current_model, name)
+    return tree
+
+def load_options(model, tree: IncludeTree, parent=None) -> List[Any]:
+    """
+    展開するリレーションシップの読み込みオプションを作る。
+    多対一は joinedload（クエリを増やさない）、一対多は selectinload（1段につき1クエリ）で、
+    件数によらずクエリ数は展開の形だけで決まる。
+    """
+    options = []
+    for name, children in tree.items():
+        attribute = getattr(model, name)
+        if attribute.property.uselist:
+            loader = parent.selectinload(attribute) if parent is not None else selectinload(attribute)
+        else:
+            loader = parent.joinedload(attribute) if parent is not None else joinedload(attribute)
+        child_options = load_options(_target(model, name), children, loader)
+        options.extend(child_options or [loader])
+    return options
+
+def tables_for(model, tree: IncludeTree) -> Set[str]:
+    """展開に含まれるテーブル名（ETag の版数に使う）"""
+    tables = set()
+    for name, children in tree.items():
+        target = _target(model, name)
+        tables.add(target.__tablename__)
+        tables |= tables_for(target, children)
+    return tables
+
+def serialize(obj, tree: IncludeTree) -> Dict[str, Any]:
+    """読み込み済みのリレーションシップだけを辿って辞書にする（未読み込みの属性には触れない）"""
+    model = type(obj)
+    data = SCHEMAS[model].from_orm(obj).dict()
+    for name, children in tree.items():
+        value = getattr(obj, name)
+        if isinstance(value, list):
+            data[name] = [serialize(child, children) for child in value]
+        else:
+            data[name] = serialize(value, children) if value is not None else None
+    return data
+
+def expanded_response(objs: Sequence[Any], tree: IncludeTree, **extra: Any) -> ORJSONResponse:
+    """展開したオブジェクトをJSONにする（形は fast_read.rows_response と同じ）"""
+    content = [serialize(obj, tree) for obj in objs]
+    if extra:
+        content = {"items": content, **extra}
+    return ORJSONResponse(content)
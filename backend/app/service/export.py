@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List
+
+from sqlalchemy.engine import Row
+from sqlalchemy.future import select
+
+from app.db.database import ReadSessionLocal
+from app.db.tenancy import DEFAULT_HOUSEHOLD_ID, set_household
+from app.models.stock import Stock
+from app.models.item import Item
+from app.models.category import Category
+from app.models.location import Location
+
+# サーバーサイドカーソルで1回に取得する行数
+EXPORT_FETCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "stock_id",
+    "item_id",
+    "barcode",
+    "item_name",
+    "category_id",
+    "category_name",
+    "location_id",
+    "location_name",
+    "quantity",
+    "min_threshold",
+    "updated_at",
+]
+
+def _export_query():
+    """エクスポート用の在庫・商品・カテゴリ・ロケーション結合クエリ"""
+    return (
+        select(
+            Stock.id.label("stock_id"),
+            Stock.item_id,
+            Item.barcode,
+            Item.name.label("item_name"),
+            Item.category_id,
+            Category.name.label("category_name"),
+            Stock.location_id,
+            Location.name.label("location_name"),
+            Stock.quantity,
+            Item.min_threshold,
+            Stock.updated_at,
+        )
+        # リレーション経由で結合すると結合先にも世帯の条件が付き、パーティションが絞り込まれる
+        .join(Stock.item)
+        .outerjoin(Item.category)
+        .outerjoin(Stock.location)
+        .order_by(Stock.id)
+    )
+
+async def _stream_partitions(fetch_size: int, household_id: int) -> AsyncIterator[List[Row]]:
+    """
+    サーバーサイドカーソルで fetch_size 行ずつ取得する。
+    レスポンスのストリーミング中もセッションを保持するため、依存性ではなくここでセッションを開く。
+    """
+    async with ReadSessionLocal() as db:
+        set_household(db, household_id)
+        result = await db.stream(_export_query().execution_options(yield_per=fetch_size))
+        async for partition in result.partitions():
+            yield partition
+
+def _to_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+async def iter_stocks_ndjson(
+    fetch_size: int = EXPORT_FETCH_SIZE, household_id: int = DEFAULT_HOUSEHOLD_ID
+) -> AsyncIterator[bytes]:
+    """世帯の在庫を1行1JSONで出力する"""
+    async for rows in _stream_partitions(fetch_size, household_id):
+        chunk = "".join(
+            json.dumps({key: _to_value(value) for key, value in row._mapping.items()}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+        yield chunk.encode("utf-8")
+
+async def iter_stocks_csv(
+    fetch_size: int = EXPORT_FETCH_SIZE, household_id: int = DEFAULT_HOUSEHOLD_ID
+) -> AsyncIterator[bytes]:
+    """世帯の在庫をCSVで出力する（先頭行はヘッダー）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # クエリ完了を待たずにヘッダーを先に送る
+    yield buffer.getvalue().encode("utf-8")
+    async for rows in _stream_partitions(fetch_size, household_id):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_to_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,29 @@
+import os
+from typing import Any, List, Sequence
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# 一覧系エンドポイントの高速パス（ORMとpydanticを経由せず、必要な列だけを orjson でそのまま返す）
+# ベンチマークで比較するため、実行中でも切り替えられるようにモジュール変数で持つ
+FAST_READ_PATH = os.getenv("FAST_READ_PATH", "true").lower() in ("1", "true", "yes", "on")
+
+def enabled() -> bool:
+    return FAST_READ_PATH
+
+def columns_for(model, schema: BaseModel) -> List:
+    """
+    レスポンススキーマのフィールドに対応する列だけを返す。
+    テーブルの列ではなくマップされた属性を使うため、セッションの世帯の絞り込みが適用される。
+    """
+    return [getattr(model, name) for name in schema.__fields__]
+
+def rows_response(rows: Sequence[Any], **extra: Any) -> ORJSONResponse:
+    """
+    DBの行をそのままJSONにする（DB由来の値なので pydantic の検証は行わない）。
+    extra を指定した場合は {"items": [...], **extra} の形で返す。
+    """
+    content = [row._asdict() for row in rows]
+    if extra:
+        content = {"items": content, **extra}
+    return ORJSONResponse(content)
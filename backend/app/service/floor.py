@@ -0,0 +1,81 @@
+import os
+from typing import Any, Dict
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.tenancy import get_household
+from app.models.item_stock_total import ItemStockTotal
+from app.models.location import Location
+from app.models.stock import Stock
+from app.service.cache import LRUCache, MISSING
+from app.service.conditional import get_table_versions
+
+# 間取り図（frontend/src/shared/static/floorPlan.json）の部屋IDと、対応するロケーション名
+# 部屋を追加・改名した場合はここも合わせて更新する
+FLOOR_ROOMS = {
+    "bathroom_changing": "脱衣所",
+    "hallway": "廊下",
+    "bath": "風呂",
+    "living_closet": "クローゼット",
+    "living": "リビング",
+    "kitchen": "キッチン",
+    "refrigerator": "冷蔵庫",
+    "shoe_rack": "下駄箱",
+    "toilet": "トイレ",
+}
+
+# 在庫の変更（テーブルの変更版数の更新）で自動的に作り直される
+OCCUPANCY_TABLES = ("items", "locations", "stocks")
+OCCUPANCY_CACHE_TTL = float(os.getenv("OCCUPANCY_CACHE_TTL", 60))
+OCCUPANCY_CACHE_SIZE = int(os.getenv("OCCUPANCY_CACHE_SIZE", 256))
+occupancy_cache = LRUCache(maxsize=OCCUPANCY_CACHE_SIZE, ttl=OCCUPANCY_CACHE_TTL)
+
+async def _compute_occupancy(db: AsyncSession) -> Dict[str, Any]:
+    in_stock = Stock.quantity > 0
+    low = ItemStockTotal.total < ItemStockTotal.min_threshold
+    query = (
+        select(
+            Location.id,
+            Location.name,
+            func.count(Stock.item_id.distinct()).filter(in_stock).label("item_count"),
+            func.coalesce(func.sum(Stock.quantity), 0).label("total_quantity"),
+            func.count(Stock.item_id.distinct()).filter(in_stock & low).label("low_stock_items"),
+        )
+        .outerjoin(Location.stocks)
+        .outerjoin(ItemStockTotal, ItemStockTotal.item_id == Stock.item_id)
+        .where(Location.name.in_(list(FLOOR_ROOMS.values())))
+        .group_by(Location.id)
+    )
+    result = await db.execute(query)
+    # ロケーション名は世帯内で一意だが、念のため id の小さい方を部屋に割り当てる
+    by_name: Dict[str, Any] = {}
+    for row in sorted(result.all(), key=lambda row: row.id):
+        by_name.setdefault(row.name, row)
+
+    rooms = []
+    for room_id, name in FLOOR_ROOMS.items():
+        row = by_name.get(name)
+        low_stock_items = row.low_stock_items if row is not None else 0
+        rooms.append({
+            "room_id": room_id,
+            "name": name,
+            "location_id": row.id if row is not None else None,
+            "item_count": row.item_count if row is not None else 0,
+            "total_quantity": row.total_quantity if row is not None else 0,
+            "low_stock_items": low_stock_items,
+            "low_stock": low_stock_items > 0,
+        })
+    return {"rooms": rooms}
+
+# 間取り図の部屋ごとの在庫集計を取得
+async def get_floor_occupancy(db: AsyncSession) -> Dict[str, Any]:
+    """世帯と、在庫・アイテム・ロケーションの変更版数が前回と同じで ttl 内なら、キャッシュした集計を返す"""
+    versions = await get_table_versions(db, OCCUPANCY_TABLES)
+    key = (get_household(db),) + tuple(versions[table] for table in OCCUPANCY_TABLES)
+    occupancy = occupancy_cache.get(key)
+    if occupancy is MISSING:
+        occupancy = await _compute_occupancy(db)
+        occupancy_cache.set(key, occupancy)
+    return occupancy
@@ -0,0 +1,149 @@
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.item_forecast import ItemForecast
+
+# numpy は読み込みに時間がかかるため、アプリの起動時ではなく予測を計算する関数の中で読み込む
+if TYPE_CHECKING:
+    import numpy as np
+
+# 消費ペースの計算に使う履歴の日数と、指数平滑の半減期（日）
+FORECAST_WINDOW_DAYS = int(os.getenv("FORECAST_WINDOW_DAYS", 56))
+FORECAST_HALF_LIFE_DAYS = float(os.getenv("FORECAST_HALF_LIFE_DAYS", 14))
+# 予測日の上限（消費がごくわずかなアイテムで日付が溢れないようにする）
+MAX_FORECAST_DAYS = 36500
+
+# 並び替えの指定と列の対応
+FORECAST_SORT_COLUMNS = {
+    "depletion": ItemForecast.days_to_depletion,
+    "threshold": ItemForecast.days_to_threshold,
+}
+
+# 日ごと・アイテムごとの消費量（減少分のみ。在庫行の削除は消費に数えない）
+CONSUMPTION_SQL = text("""
+    SELECT item_id, CAST(:now AS date) - CAST(created_at AS date) AS days_ago, sum(-delta) AS consumed
+    FROM stock_movements
+    WHERE created_at > CAST(:now AS timestamptz) - make_interval(days => :window)
+      AND delta < 0 AND reason <> 'delete'
+    GROUP BY item_id, days_ago
+""")
+
+TOTALS_SQL = text("""
+    SELECT i.id, coalesce(t.total, 0) AS total, i.min_threshold, i.household_id
+    FROM items i LEFT JOIN item_stock_totals t ON t.household_id = i.household_id AND t.item_id = i.id
+    ORDER BY i.id
+""")
+
+# 配列のまま1文で書き込む（NaN は NULL にする）
+STORE_SQL = text("""
+    INSERT INTO item_forecasts
+        (household_id, item_id, daily_rate, current_total, min_threshold, days_to_threshold, days_to_depletion, depletes_on, computed_at)
+    SELECT f.household_id, f.item_id, f.daily_rate, f.current_total, f.min_threshold,
+           nullif(f.days_to_threshold, 'NaN'), nullif(f.days_to_depletion, 'NaN'),
+           CASE WHEN f.days_to_depletion = 'NaN' THEN NULL
+                ELSE CAST(CAST(:now AS timestamptz) AS date) + CAST(least(floor(f.days_to_depletion), :max_days) AS integer) END,
+           CAST(:now AS timestamptz)
+    FROM unnest(
+        CAST(:household_ids AS integer[]), CAST(:item_ids AS integer[]), CAST(:daily_rates AS float8[]), CAST(:totals AS integer[]),
+        CAST(:thresholds AS integer[]), CAST(:days_to_threshold AS float8[]), CAST(:days_to_depletion AS float8[])
+    ) AS f(household_id, item_id, daily_rate, current_total, min_threshold, days_to_threshold, days_to_depletion)
+""")
+
+def compute_forecasts(
+    item_ids: "np.ndarray",
+    totals: "np.ndarray",
+    thresholds: "np.ndarray",
+    usage_items: "np.ndarray",
+    usage_days: "np.ndarray",
+    usage_amounts: "np.ndarray",
+    window: int = FORECAST_WINDOW_DAYS,
+    half_life: float = FORECAST_HALF_LIFE_DAYS,
+) -> Dict[str, "np.ndarray"]:
+    """
+    全アイテムの消費ペースと在庫切れまでの日数をまとめて計算する。
+    item_ids は昇順。usage_* は (アイテム, 何日前, 消費量) の組で、日ごとの消費量を
+    半減期 half_life の指数重みで平均したものを1日あたりの消費量とする。
+    """
+    import numpy as np
+
+    days = np.arange(window)
+    weights = 0.5 ** (days / half_life)
+    weights /= weights.sum()
+
+    index = np.searchsorted(item_ids, usage_items)
+    valid = (index < len(item_ids)) & (usage_days >= 0) & (usage_days < window)
+    valid[valid] = item_ids[index[valid]] == usage_items[valid]
+    daily_rate = np.bincount(
+        index[valid],
+        weights=usage_amounts[valid] * weights[usage_days[valid]],
+        minlength=len(item_ids),
+    )
+
+    consuming = daily_rate > 0
+    safe_rate = np.where(consuming, daily_rate, 1.0)
+    days_to_depletion = np.where(consuming, np.maximum(totals, 0) / safe_rate, np.nan)
+    days_to_threshold = np.where(consuming, np.maximum(totals - thresholds, 0) / safe_rate, np.nan)
+    return {
+        "daily_rate": daily_rate,
+        "days_to_threshold": days_to_threshold,
+        "days_to_depletion": days_to_depletion,
+    }
+
+# 在庫切れ予測の作り直し
+async def refresh_forecasts(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """履歴を一括で読み込んで全世帯・全アイテムの予測を計算し、予測テーブルを入れ替える（アイテムIDは全世帯で一意）"""
+    import numpy as np
+
+    now = now or datetime.now(timezone.utc)
+
+    totals_result = await db.execute(TOTALS_SQL)
+    totals_rows = totals_result.all()
+    item_ids = np.fromiter((row[0] for row in totals_rows), dtype=np.int64, count=len(totals_rows))
+    totals = np.fromiter((row[1] for row in totals_rows), dtype=np.int64, count=len(totals_rows))
+    thresholds = np.fromiter((row[2] for row in totals_rows), dtype=np.int64, count=len(totals_rows))
+    household_ids = [row[3] for row in totals_rows]
+
+    usage_result = await db.execute(CONSUMPTION_SQL, {"now": now, "window": FORECAST_WINDOW_DAYS})
+    usage = np.array(usage_result.all(), dtype=np.float64).reshape(-1, 3)
+    forecasts = compute_forecasts(
+        item_ids,
+        totals,
+        thresholds,
+        usage[:, 0].astype(np.int64),
+        usage[:, 1].astype(np.int64),
+        usage[:, 2],
+    )
+
+    await db.execute(text("DELETE FROM item_forecasts"))
+    if len(item_ids):
+        await db.execute(STORE_SQL, {
+            "now": now,
+            "max_days": MAX_FORECAST_DAYS,
+            "household_ids": household_ids,
+            "item_ids": item_ids.tolist(),
+            "daily_rates": forecasts["daily_rate"].tolist(),
+            "totals": totals.tolist(),
+            "thresholds": thresholds.tolist(),
+            "days_to_threshold": forecasts["days_to_threshold"].tolist(),
+            "days_to_depletion": forecasts["days_to_depletion"].tolist(),
+        })
+    await db.commit()
+    return len(item_ids)
+
+# 在庫切れ予測の取得
+async def get_forecasts(
+    db: AsyncSession, sort: str = "depletion", skip: int = 0, limit: int = 100, include_idle: bool = False
+) -> List[ItemForecast]:
+    """在庫切れ（または min_threshold 割れ）が近い順に予測を返す（消費の無いアイテムは末尾または除外）"""
+    column = FORECAST_SORT_COLUMNS[sort]
+    query = select(ItemForecast)
+    if not include_idle:
+        query = query.where(column.is_not(None))
+    query = query.order_by(column.asc().nulls_last(), ItemForecast.item_id).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
@@ -0,0 +1,272 @@
+import codecs
+import csv
+import json
+import re
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.tenancy import get_household
+from app.schemas.imports import ImportReport
+from app.service.item import invalidate_item_cache
+from app.service.stock_movement import set_movement_reason
+
+# COPY 1回あたりの行数
+IMPORT_BATCH_SIZE = 10000
+# 数値列（PostgreSQL の integer）の範囲
+INT_MIN, INT_MAX = -2**31, 2**31 - 1
+
+# ステージングテーブルの列（エクスポートの列名と揃えているため、エクスポート結果をそのまま取り込める）
+STAGING_COLUMNS = [
+    "line_no",
+    "barcode",
+    "item_name",
+    "category_name",
+    "location_name",
+    "quantity",
+    "min_threshold",
+]
+
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE import_staging (
+    line_no bigint NOT NULL,
+    barcode text,
+    item_name text,
+    category_name text,
+    location_name text,
+    quantity integer,
+    min_threshold integer
+) ON COMMIT DROP
+"""
+
+# ステージングから本テーブルへの集合演算によるマージ（名前→IDの解決は JOIN で行う）
+# 一意性は世帯ごとなので、世帯IDを明示して対象の世帯だけを照合する
+MERGE_CATEGORIES_SQL = """
+INSERT INTO categories (household_id, name)
+SELECT DISTINCT :household_id, left(category_name, 50) FROM import_staging
+WHERE category_name IS NOT NULL AND category_name <> ''
+ON CONFLICT (household_id, name) DO NOTHING
+"""
+
+MERGE_LOCATIONS_SQL = """
+INSERT INTO locations (household_id, name)
+SELECT DISTINCT :household_id, left(location_name, 50) FROM import_staging
+WHERE location_name IS NOT NULL AND location_name <> ''
+ON CONFLICT (household_id, name) DO NOTHING
+"""
+
+# 同じバーコードが複数行ある場合は最後の行を採用する
+# 空欄の項目は既存のアイテムの値を残す（min_threshold は既存の値を JOIN で引き継ぎ、新規なら1）
+MERGE_ITEMS_SQL = """
+INSERT INTO items (household_id, barcode, name, category_id, min_threshold)
+SELECT DISTINCT ON (s.barcode) :household_id, s.barcode, left(s.item_name, 100), c.id,
+       coalesce(s.min_threshold, i.min_threshold, 1)
+FROM import_staging s
+LEFT JOIN categories c ON c.household_id = :household_id AND c.name = left(s.category_name, 50)
+LEFT JOIN items i ON i.household_id = :household_id AND i.barcode = s.barcode
+WHERE s.barcode IS NOT NULL AND length(s.barcode) BETWEEN 1 AND 13
+ORDER BY s.barcode, s.line_no DESC
+ON CONFLICT (household_id, barcode) DO UPDATE SET
+    name = coalesce(excluded.name, items.name),
+    category_id = coalesce(excluded.category_id, items.category_id),
+    min_threshold = excluded.min_threshold,
+    updated_at = now()
+"""
+
+# インポートする数量は増減ではなく現在の在庫数として扱う
+MERGE_STOCKS_SQL = """
+INSERT INTO stocks (household_id, item_id, location_id, quantity)
+SELECT :household_id, i.id, l.id, greatest(sum(s.quantity), 0)
+FROM import_staging s
+JOIN items i ON i.household_id = :household_id AND i.barcode = s.barcode
+JOIN locations l ON l.household_id = :household_id AND l.name = left(s.location_name, 50)
+WHERE s.quantity IS NOT NULL
+GROUP BY i.id, l.id
+ON CONFLICT (household_id, item_id, location_id) DO UPDATE SET
+    quantity = excluded.quantity,
+    version = stocks.version + 1,
+    updated_at = now()
+"""
+
+COUNT_SKIPPED_SQL = """
+SELECT count(*) FROM import_staging
+WHERE barcode IS NULL OR length(barcode) NOT BETWEEN 1 AND 13
+"""
+
+def _to_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _to_int(value: Any, line_no: int, field: str) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"line {line_no}: {field} must be an integer")
+    # ステージングの integer 列に入らない値は COPY の段階で失敗するため、ここで行番号付きで弾く
+    if not INT_MIN <= number <= INT_MAX:
+        raise ValueError(f"line {line_no}: {field} is out of range")
+    return number
+
+def _to_record(line_no: int, data: Dict[str, Any]) -> Tuple:
+    return (
+        line_no,
+        _to_text(data.get("barcode")),
+        _to_text(data.get("item_name")),
+        _to_text(data.get("category_name")),
+        _to_text(data.get("location_name")),
+        _to_int(data.get("quantity"), line_no, "quantity"),
+        _to_int(data.get("min_threshold"), line_no, "min_threshold"),
+    )
+
+# 改行（\r\n / \r / \n）までを1行とする。csv モジュールが行を区切るのと同じ規則
+LINE_RE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)")
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[List[str]]:
+    """
+    受信したバイト列を UTF-8（先頭の BOM は除く）で順に復号し、チャンクごとに揃った行（改行付き）を返す。
+    不正なバイト列は UnicodeDecodeError（ValueError）になる。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # 改行がまだ来ていない行の断片（長い行でも、受け取ったチャンクだけを走査する）
+    pending: List[str] = []
+    async for chunk in chunks:
+        text_ = decoder.decode(chunk)
+        end = max(text_.rfind("\n"), text_.rfind("\r")) + 1
+        if end == 0:
+            pending.append(text_)
+            continue
+        lines = LINE_RE.findall("".join(pending) + text_[:end])
+        pending = [text_[end:]]
+        # 末尾の \r は次のチャンクの \n と合わせて1つの改行かもしれないので持ち越す
+        if end == len(text_) and text_.endswith("\r"):
+            pending = [lines.pop()]
+        if lines:
+            yield lines
+    rest = "".join(pending) + decoder.decode(b"", final=True)
+    if rest:
+        lines = LINE_RE.findall(rest)
+        tail = rest[sum(len(line) for line in lines):]
+        yield lines + [tail] if tail else lines
+
+class _RecordFeed:
+    """
+    csv.reader に行を渡すイテレーター（行が尽きると StopIteration になり、行を足せば続きから読める）。
+    csv.reader は引用符の途中で行が尽きるとレコードを打ち切ってしまうため、
+    引用符が閉じるまで（引用符の数が偶数になるまで）の行はまとめて渡す。
+    """
+
+    def __init__(self):
+        self.ready: Deque[str] = deque()
+        self.partial: List[str] = []
+        self.quotes = 0
+
+    def extend(self, lines: List[str]) -> None:
+        for line in lines:
+            self.partial.append(line)
+            self.quotes += line.count('"')
+            if self.quotes % 2 == 0:
+                self.ready.extend(self.partial)
+                self.partial = []
+                self.quotes = 0
+
+    def close(self) -> None:
+        """残りの行をすべて渡す（閉じていない引用符は csv.reader の扱いに任せる）"""
+        self.ready.extend(self.partial)
+        self.partial = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.ready:
+            raise StopIteration
+        return self.ready.popleft()
+
+async def _iter_records(chunks: AsyncIterable[bytes], fmt: str) -> AsyncIterator[Tuple]:
+    """受信しながら、CSV（ヘッダー付き）またはNDJSONを1行ずつステージング用のタプルに変換する"""
+    if fmt == "csv":
+        feed = _RecordFeed()
+        reader = csv.DictReader(feed)
+        async for lines in _iter_lines(chunks):
+            feed.extend(lines)
+            for data in reader:
+                yield _to_record(reader.line_num, data)
+        feed.close()
+        for data in reader:
+            yield _to_record(reader.line_num, data)
+        return
+    line_no = 0
+    async for lines in _iter_lines(chunks):
+        for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                raise ValueError(f"line {line_no}: invalid JSON")
+            if not isinstance(data, dict):
+                raise ValueError(f"line {line_no}: expected a JSON object")
+            yield _to_record(line_no, data)
+
+async def _copy_batch(driver_connection, batch: List[Tuple]) -> int:
+    await driver_connection.copy_records_to_table(
+        "import_staging", records=batch, columns=STAGING_COLUMNS
+    )
+    return len(batch)
+
+async def import_inventory(
+    db: AsyncSession, chunks: AsyncIterable[bytes], fmt: str = "csv", batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportReport:
+    """
+    CSV/NDJSON（UTF-8 のバイト列のチャンク）を受け取りながら、batch_size 行ごとに asyncpg の COPY で一時テーブルに流し込み、
+    categories / locations / items / stocks へ集合演算でマージする。
+    不正な入力は ValueError または csv.Error になる（ロールバックは呼び出し側で行う）。
+    """
+    started = time.perf_counter()
+
+    await set_movement_reason(db, "import")
+    await db.execute(text(CREATE_STAGING_SQL))
+    # セッションと同じトランザクション上の asyncpg 接続で COPY する
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    rows = 0
+    batch: List[Tuple] = []
+    async for record in _iter_records(chunks, fmt):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            rows += await _copy_batch(driver_connection, batch)
+            batch = []
+    if batch:
+        rows += await _copy_batch(driver_connection, batch)
+
+    await db.execute(text("ANALYZE import_staging"))
+    skipped = (await db.execute(text(COUNT_SKIPPED_SQL))).scalar_one()
+    params = {"household_id": get_household(db)}
+    categories = (await db.execute(text(MERGE_CATEGORIES_SQL), params)).rowcount
+    locations = (await db.execute(text(MERGE_LOCATIONS_SQL), params)).rowcount
+    items = (await db.execute(text(MERGE_ITEMS_SQL), params)).rowcount
+    stocks = (await db.execute(text(MERGE_STOCKS_SQL), params)).rowcount
+    await db.commit()
+    invalidate_item_cache()
+
+    elapsed = time.perf_counter() - started
+    return ImportReport(
+        rows=rows,
+        skipped=skipped,
+        categories=categories,
+        items=items,
+        locations=locations,
+        stocks=stocks,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+    )
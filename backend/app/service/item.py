@@ -1,13 +1,144 @@
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import case, func, literal_column, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.db.tenancy import get_household
 from app.models.item import Item
+from app.models.item_stock_total import ItemStockTotal
+from app.schemas.item import Item as ItemSchema, ItemSearchResult, LowStockItem
+from app.service.cache import LRUCache, MISSING
+from app.service.fast_read import columns_for
+from app.service.pagination import encode_cursor, decode_cursor
+
+# キーセットページネーションのソートキー（ix_items_name_id と同じ式にすること）
+ITEM_SORT_NAME = func.coalesce(Item.name, literal_column("''"))
+
+# 高速パスで取得する列
+ITEM_COLUMNS = columns_for(Item, ItemSchema)
+
+# (世帯, バーコード)→アイテムのキャッシュ（読み取りの繰り返しでDBに問い合わせないため）
+item_barcode_cache = LRUCache(maxsize=10000, ttl=300)
+
+def invalidate_item_cache(household_id: Optional[int] = None, barcodes: Optional[Iterable[str]] = None) -> None:
+    """アイテム更新時にバーコードキャッシュを破棄する（省略時は全件）"""
+    if household_id is None or barcodes is None:
+        item_barcode_cache.clear()
+        return
+    for barcode in barcodes:
+        item_barcode_cache.invalidate((household_id, barcode))
 
 # アイテムの取得（全件）
-async def get_items(db: AsyncSession, skip: int = 0, limit: int = 25) -> List[Item]:
-    """すべてのアイテムを取得する"""
-    query = select(Item).offset(skip).limit(limit)
+async def get_items(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 25,
+    as_rows: bool = False,
+    ids: Optional[List[int]] = None,
+    options: Sequence[Any] = (),
+) -> List[Item]:
+    """
+    すべてのアイテムを取得する（as_rows=True の場合はORMを経由せず行のまま返す）。
+    ids を指定した場合はそのIDのアイテムだけを id 順に返す（skip/limit は使わない）。
+    options にはリレーションシップの読み込みオプションを指定する。
+    """
+    query = select(*ITEM_COLUMNS) if as_rows else select(Item).options(*options)
+    if ids is not None:
+        query = query.where(Item.id.in_(ids)).order_by(Item.id)
+    else:
+        query = query.offset(skip).limit(limit)
     result = await db.execute(query)
-    items = result.scalars().all()
+    items = result.all() if as_rows else result.scalars().all()
     return items
+
+# アイテムの取得（キーセットページネーション）
+async def get_items_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 25,
+    as_rows: bool = False,
+    options: Sequence[Any] = (),
+) -> Tuple[List[Item], Optional[str]]:
+    """(name, id) 順にアイテムを取得し、次ページのカーソルを返す"""
+    query = (select(*ITEM_COLUMNS) if as_rows else select(Item).options(*options)).order_by(ITEM_SORT_NAME, Item.id)
+    if cursor:
+        name, item_id = decode_cursor(cursor, 2)
+        if not isinstance(name, str) or not isinstance(item_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(ITEM_SORT_NAME, Item.id) > tuple_(name, item_id))
+    # 次ページの有無を判定するため1件多く取得する
+    result = await db.execute(query.limit(limit + 1))
+    items = result.all() if as_rows else result.scalars().all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([last.name or "", last.id])
+    return items, next_cursor
+
+# バーコードでアイテムを取得
+async def get_item_by_barcode(db: AsyncSession, barcode: str) -> Optional[ItemSchema]:
+    """バーコードに一致するアイテムを取得する（キャッシュ優先）"""
+    items = await get_items_by_barcodes(db, [barcode])
+    return items[barcode]
+
+# 複数バーコードでアイテムを一括取得
+async def get_items_by_barcodes(db: AsyncSession, barcodes: List[str]) -> Dict[str, Optional[ItemSchema]]:
+    """キャッシュに無いバーコードだけを1クエリで取得する"""
+    household_id = get_household(db)
+    found: Dict[str, Optional[ItemSchema]] = {}
+    missing = []
+    for barcode in dict.fromkeys(barcodes):
+        cached = item_barcode_cache.get((household_id, barcode))
+        if cached is MISSING:
+            missing.append(barcode)
+        else:
+            found[barcode] = cached
+
+    if missing:
+        result = await db.execute(select(Item).where(Item.barcode.in_(missing)))
+        for item in result.scalars().all():
+            schema = ItemSchema.from_orm(item)
+            item_barcode_cache.set((household_id, item.barcode), schema)
+            found[item.barcode] = schema
+
+    return {barcode: found.get(barcode) for barcode in barcodes}
+
+# 商品名のあいまい検索
+async def search_items(db: AsyncSession, q: str, limit: int = 20) -> List[ItemSearchResult]:
+    """
+    部分一致（ILIKE）またはトライグラム類似（%）で商品名を検索し、
+    部分一致を優先して類似度順に返す。どちらも ix_items_name_trgm を使う。
+    """
+    score = func.similarity(Item.name, q)
+    substring = Item.name.icontains(q, autoescape=True)
+    query = (
+        select(Item, score.label("score"))
+        .where(or_(substring, Item.name.op("%")(q)))
+        .order_by(case((substring, 0), else_=1), score.desc(), Item.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return [
+        ItemSearchResult(**ItemSchema.from_orm(item).dict(), score=row_score)
+        for item, row_score in result.all()
+    ]
+
+# 在庫不足のアイテムを取得
+async def get_low_stock_items(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[LowStockItem]:
+    """集計テーブルの部分インデックス（total < min_threshold）から在庫不足のアイテムを取得する"""
+    query = (
+        select(Item, ItemStockTotal.total)
+        .join(ItemStockTotal, ItemStockTotal.item_id == Item.id)
+        .where(ItemStockTotal.total < ItemStockTotal.min_threshold)
+        .order_by(ItemStockTotal.item_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return [
+        LowStockItem(**ItemSchema.from_orm(item).dict(), total=total)
+        for item, total in result.all()
+    ]
@@ -0,0 +1,42 @@
+from app.db.database import AsyncSessionLocal, ReadSessionLocal
+from app.service.conditional import compact_table_changes
+from app.service.dashboard import get_dashboard_summary
+from app.service.floor import get_floor_occupancy
+from app.service.forecast import refresh_forecasts
+from app.service.scheduler import scheduler
+from app.service.stock_movement import compact_stock_movements
+from app.service.sync import prune_tombstones
+
+# 定期実行するジョブ（時刻は UTC。18:15 UTC は日本時間の 3:15）
+# DBの内容を作り直すジョブはリーダーだけが、プロセス内キャッシュを温めるジョブは各ワーカーが実行する
+
+@scheduler.job(cron="15 18 * * *", jitter=60, timeout=1800)
+async def compact_movements():
+    """在庫履歴のスナップショット作成と月別パーティションの準備"""
+    async with AsyncSessionLocal() as db:
+        await compact_stock_movements(db)
+
+@scheduler.job(cron="45 18 * * *", jitter=60, timeout=600)
+async def prune_sync_tombstones():
+    """保持期間を過ぎた差分同期の削除記録を消す"""
+    async with AsyncSessionLocal() as db:
+        await prune_tombstones(db)
+
+@scheduler.job(cron="*/10 * * * *", jitter=30, timeout=300)
+async def compact_version_changes():
+    """ETag用の変更記録を世帯・テーブルごとに1行へまとめる"""
+    async with AsyncSessionLocal() as db:
+        await compact_table_changes(db)
+
+@scheduler.job(cron="5 * * * *", jitter=60, timeout=900)
+async def refresh_item_forecasts():
+    """在庫切れ予測の作り直し"""
+    async with AsyncSessionLocal() as db:
+        await refresh_forecasts(db)
+
+@scheduler.job(interval=60, jitter=10, leader_only=False, run_at_start=True, timeout=60)
+async def warm_summary_caches():
+    """既定の世帯のダッシュボードと間取り図の集計キャッシュを温める（データが変わっていなければDBは版数の確認だけ）"""
+    async with ReadSessionLocal() as db:
+        await get_dashboard_summary(db)
+        await get_floor_occupancy(db)
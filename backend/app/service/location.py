@@ -1,13 +1,29 @@
-from typing import List
+from typing import Any, List, Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.models.location import Location
+from app.schemas.location import Location as LocationSchema
+from app.service.fast_read import columns_for
+
+# 高速パスで取得する列
+LOCATION_COLUMNS = columns_for(Location, LocationSchema)
 
 # すべての部屋を取得
-async def get_locations(db: AsyncSession) -> List[Location]:
-    """すべてのロケーションを取得する"""
-    query = select(Location)
+async def get_locations(
+    db: AsyncSession,
+    as_rows: bool = False,
+    ids: Optional[List[int]] = None,
+    options: Sequence[Any] = (),
+) -> List[Location]:
+    """
+    すべてのロケーションを取得する（as_rows=True の場合はORMを経由せず行のまま返す）。
+    ids を指定した場合はそのIDのロケーションだけを id 順に返す。
+    options にはリレーションシップの読み込みオプションを指定する。
+    """
+    query = select(*LOCATION_COLUMNS) if as_rows else select(Location).options(*options)
+    if ids is not None:
+        query = query.where(Location.id.in_(ids)).order_by(Location.id)
     result = await db.execute(query)
-    locations = result.scalars().all()
-    return locations
\ No newline at end of file
+    locations = result.all() if as_rows else result.scalars().all()
+    return locations
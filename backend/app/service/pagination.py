@@ -0,0 +1,26 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+from fastapi import HTTPException
+
+# キーセットページネーション用のカーソル
+# ソートキーの値をJSON化してbase64urlでエンコードした不透明な文字列として扱う
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """ソートキーの値からカーソル文字列を生成する"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """カーソル文字列をソートキーの値に戻す（不正な場合は400）"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
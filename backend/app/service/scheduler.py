@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import asyncpg
+
+from app.db.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+SCHEDULER_ENABLED = _env_bool("SCHEDULER_ENABLED", True)
+# 同時に実行できるジョブの数（ワーカーごと）
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", 2))
+# リーダー選出に使う advisory lock のキーと、取得できなかったときの再試行間隔（秒）
+SCHEDULER_LOCK_KEY = int(os.getenv("SCHEDULER_LOCK_KEY", 7_318_004))
+LEADER_RETRY_SECONDS = 15
+
+class CronSchedule:
+    """
+    5フィールド（分 時 日 月 曜日）の cron 式（UTC）。* / 範囲 a-b / 列挙 a,b / 間隔 */n に対応する。
+    日と曜日の両方が指定された場合はどちらかに一致すればよい（cron と同じ）。
+    """
+
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.FIELDS)
+        )
+        # 曜日の 7 は日曜日（0）として扱う
+        self.weekdays = {0 if day == 7 else day for day in self.weekdays}
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(value) for value in part.split("-", 1))
+            else:
+                start = end = int(part)
+                if step != 1:
+                    end = high
+            if start < low or end > (7 if high == 6 else high) or start > end or step < 1:
+                raise ValueError(f"invalid cron field: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        # datetime.weekday() は月曜が0なので cron の曜日（日曜が0）に変換する
+        in_days = moment.day in self.days
+        in_weekdays = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """moment より後で式に一致する最初の時刻（分単位）"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron expression never matches: {self.expression!r}")
+
+class JobStats:
+    """ジョブの実行回数と所要時間（ワーカープロセス単位）"""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.running = False
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration_seconds = 0.0
+        self.max_duration_seconds = 0.0
+        self.total_duration_seconds = 0.0
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[datetime] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+class Job:
+    """
+    定期実行するジョブ。interval（秒）か cron 式のどちらかを指定する。
+    leader_only=True のジョブはリーダーのワーカーだけが実行する（クラスタ全体で1回）。
+    False のジョブ（プロセス内キャッシュの温めなど）は各ワーカーで実行する。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: Optional[float] = None,
+        cron: Optional[str] = None,
+        jitter: float = 0.0,
+        leader_only: bool = True,
+        run_at_start: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        if (interval is None) == (cron is None):
+            raise ValueError("specify exactly one of interval or cron")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron is not None else None
+        self.jitter = jitter
+        self.leader_only = leader_only
+        self.run_at_start = run_at_start
+        self.timeout = timeout
+        self.stats = JobStats()
+
+    def next_delay(self, first: bool = False) -> float:
+        """次回実行までの秒数（jitter 秒以内のランダムな遅れを加える）"""
+        if first and self.run_at_start:
+            delay = 0.0
+        elif self.interval is not None:
+            delay = self.interval
+        else:
+            now = datetime.now(timezone.utc)
+            delay = (self.cron.next_after(now) - now).total_seconds()
+        return delay + random.uniform(0, self.jitter)
+
+class Scheduler:
+    """
+    lifespan で開始・停止する asyncio のジョブスケジューラ。
+    ジョブごとに1つのタスクで待機し、実行はセマフォで同時実行数を制限する（同じジョブは重ならない）。
+    リーダーは専用接続の pg_try_advisory_lock で選び、接続が切れるとリーダーではなくなる。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = SCHEDULER_MAX_CONCURRENCY,
+        lock_key: int = SCHEDULER_LOCK_KEY,
+        dsn: str = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1),
+    ):
+        self.max_concurrency = max_concurrency
+        self.lock_key = lock_key
+        self.dsn = dsn
+        self.jobs: Dict[str, Job] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._leader_connection: Optional[asyncpg.Connection] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_connection is not None and not self._leader_connection.is_closed()
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Any]], **options: Any) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"job already registered: {name}")
+        job = Job(name, func, **options)
+        self.jobs[name] = job
+        return job
+
+    def job(self, name: Optional[str] = None, **options: Any):
+        """ジョブを登録するデコレーター"""
+        def decorator(func):
+            self.add_job(name or func.__name__, func, **options)
+            return func
+        return decorator
+
+    def start(self) -> None:
+        if self._tasks or not SCHEDULER_ENABLED:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if any(job.leader_only for job in self.jobs.values()):
+            self._tasks.append(asyncio.create_task(self._elect_leader()))
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._run_job(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._leader_connection is not None and not self._leader_connection.is_closed():
+            await self._leader_connection.close()
+        self._leader_connection = None
+
+    async def run_now(self, name: str) -> None:
+        """ジョブをその場で1回実行する（スケジュールとは独立）"""
+        await self._execute(self.jobs[name])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "enabled": SCHEDULER_ENABLED,
+            "leader": self.is_leader,
+            "jobs": {name: job.stats.as_dict() for name, job in self.jobs.items()},
+        }
+
+    async def _elect_leader(self) -> None:
+        while True:
+            if not self.is_leader:
+                connection = None
+                try:
+                    connection = await asyncpg.connect(self.dsn)
+                    if await connection.fetchval("SELECT pg_try_advisory_lock($1)", self.lock_key):
+                        logger.info("scheduler leader elected (pid %d)", os.getpid())
+                        self._leader_connection, connection = connection, None
+                except (OSError, asyncpg.PostgresError) as e:
+                    logger.warning("scheduler leader election failed: %s", e)
+                finally:
+                    if connection is not None:
+                        await connection.close()
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+    async def _run_job(self, job: Job) -> None:
+        first = True
+        while True:
+            delay = job.next_delay(first)
+            first = False
+            job.stats.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+            if job.leader_only and not self.is_leader:
+                job.stats.skipped += 1
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: Job) -> None:
+        async with self._semaphore or asyncio.Semaphore(1):
+            stats = job.stats
+            stats.running = True
+            stats.last_started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(job.func(), timeout=job.timeout)
+                stats.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.failures += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+                logger.exception("scheduled job %s failed", job.name)
+            finally:
+                elapsed = time.perf_counter() - started
+                stats.running = False
+                stats.runs += 1
+                stats.last_duration_seconds = elapsed
+                stats.total_duration_seconds += elapsed
+                stats.max_duration_seconds = max(stats.max_duration_seconds, elapsed)
+
+# ワーカープロセスで共有するスケジューラ（lifespan で開始・停止する）
+scheduler = Scheduler()
@@ -1,13 +1,278 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import Integer, column, func, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
 from sqlalchemy.future import select
 
+from app.db.tenancy import get_household
 from app.models.stock import Stock
+from app.models.item import Item
+from app.models.category import Category
+from app.models.location import Location
+from app.schemas.stock import Stock as StockSchema, StockBatchEntry, StockBatchResult
+from app.service.fast_read import columns_for
+from app.service.pagination import encode_cursor, decode_cursor
+from app.service.stock_movement import set_movement_reason
+
+# 高速パスで取得する列
+STOCK_COLUMNS = columns_for(Stock, StockSchema)
+
+# 在庫一覧表示で並び替え可能な列
+STOCK_VIEW_SORT_COLUMNS = {
+    "itemName": Item.name,
+    "locationName": Location.name,
+    "categoryName": Category.name,
+    "quantity": Stock.quantity,
+    "updated_at": Stock.updated_at,
+}
 
 # 在庫の取得（全件）
-async def get_stocks(db: AsyncSession, skip: int = 0, limit: int = 25) -> List[Stock]:
-    """すべての在庫を取得する"""
-    query = select(Stock).offset(skip).limit(limit)
+async def get_stocks(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 25,
+    as_rows: bool = False,
+    ids: Optional[List[int]] = None,
+    options: Sequence[Any] = (),
+) -> List[Stock]:
+    """
+    すべての在庫を取得する（as_rows=True の場合はORMを経由せず行のまま返す）。
+    ids を指定した場合はそのIDの在庫だけを id 順に返す（skip/limit は使わない）。
+    options にはリレーションシップの読み込みオプションを指定する。
+    """
+    query = select(*STOCK_COLUMNS) if as_rows else select(Stock).options(*options)
+    if ids is not None:
+        query = query.where(Stock.id.in_(ids)).order_by(Stock.id)
+    else:
+        query = query.offset(skip).limit(limit)
     result = await db.execute(query)
-    stocks = result.scalars().all()
+    stocks = result.all() if as_rows else result.scalars().all()
     return stocks
+
+# 在庫の取得（キーセットページネーション）
+async def get_stocks_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 25,
+    as_rows: bool = False,
+    options: Sequence[Any] = (),
+) -> Tuple[List[Stock], Optional[str]]:
+    """(updated_at, id) 順に在庫を取得し、次ページのカーソルを返す"""
+    query = (select(*STOCK_COLUMNS) if as_rows else select(Stock).options(*options)).order_by(Stock.updated_at, Stock.id)
+    if cursor:
+        updated_at, stock_id = decode_cursor(cursor, 2)
+        try:
+            updated_at = datetime.fromisoformat(updated_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if not isinstance(stock_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Stock.updated_at, Stock.id) > tuple_(updated_at, stock_id))
+    # 次ページの有無を判定するため1件多く取得する
+    result = await db.execute(query.limit(limit + 1))
+    stocks = result.all() if as_rows else result.scalars().all()
+
+    next_cursor = None
+    if len(stocks) > limit:
+        stocks = stocks[:limit]
+        last = stocks[-1]
+        next_cursor = encode_cursor([last.updated_at, last.id])
+    return stocks, next_cursor
+
+# 在庫数の増減（アトミックな UPDATE ... RETURNING）
+async def adjust_stock(
+    db: AsyncSession, stock_id: int, delta: int, expected_version: Optional[int] = None
+) -> Stock:
+    """
+    quantity = quantity + delta を1文で実行する（読み取り→書き込みをしないため更新が失われない）。
+    expected_version を指定した場合はバージョンが一致するときだけ更新する。
+    """
+    await set_movement_reason(db, "adjust")
+    conditions = [Stock.id == stock_id, Stock.quantity + delta >= 0]
+    if expected_version is not None:
+        conditions.append(Stock.version == expected_version)
+    stmt = (
+        update(Stock)
+        .where(*conditions)
+        .values(quantity=Stock.quantity + delta, version=Stock.version + 1, updated_at=func.now())
+        .returning(Stock)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    stock = result.scalars().first()
+    if stock is not None:
+        await db.commit()
+        return stock
+
+    # 更新されなかった理由を判定する（失敗時のみ実行）
+    result = await db.execute(select(Stock.quantity, Stock.version).where(Stock.id == stock_id))
+    current = result.first()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    if expected_version is not None and current.version != expected_version:
+        raise HTTPException(status_code=412, detail="Stock version mismatch")
+    raise HTTPException(status_code=409, detail="Quantity cannot be negative")
+
+# 在庫一覧表示用の取得（結合・絞り込み・並び替えをSQLで実行）
+async def get_stock_view(
+    db: AsyncSession,
+    category_id: Optional[int] = None,
+    location: Optional[str] = None,
+    keyword: Optional[str] = None,
+    sort: str = "itemName",
+    order: str = "asc",
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Row]:
+    """商品名・ロケーション名・カテゴリ名を結合した在庫一覧を1クエリで取得する"""
+    query = (
+        select(
+            Stock.id,
+            Stock.item_id,
+            Stock.location_id,
+            Stock.quantity,
+            Stock.updated_at,
+            Item.name.label("itemName"),
+            Location.name.label("locationName"),
+            Category.name.label("categoryName"),
+        )
+        # リレーション経由で結合すると結合先にも世帯の条件が付き、パーティションが絞り込まれる
+        .join(Stock.item)
+        .outerjoin(Item.category)
+        .outerjoin(Stock.location)
+    )
+
+    if category_id is not None:
+        query = query.where(Item.category_id == category_id)
+    if location:
+        query = query.where(Location.name == location)
+    if keyword:
+        query = query.where(Item.name.icontains(keyword, autoescape=True))
+
+    sort_column = STOCK_VIEW_SORT_COLUMNS[sort]
+    sort_column = sort_column.desc() if order == "desc" else sort_column.asc()
+    # 同値の行の順序を安定させるため在庫IDを第2キーにする
+    query = query.order_by(sort_column.nulls_last(), Stock.id).offset(skip).limit(limit)
+
+    result = await db.execute(query)
+    return result.all()
+
+# 在庫の一括入出庫（バーコード読み取り結果の取り込み）
+async def apply_stock_batch(db: AsyncSession, entries: List[StockBatchEntry]) -> List[StockBatchResult]:
+    """
+    バーコードを1クエリで商品IDに解決し、(item_id, location_id) ごとに合算した増減を反映する。
+    入庫は INSERT ... ON CONFLICT DO UPDATE の1文、出庫は UPDATE ... FROM (VALUES ...) の1文で行う。
+    在庫が足りない出庫は反映せず insufficient_stock とし（数量は切り詰めない）、合算して0になる増減は書き込まない。
+    """
+    if not entries:
+        return []
+
+    barcodes = {entry.barcode for entry in entries}
+    result = await db.execute(select(Item.barcode, Item.id).where(Item.barcode.in_(barcodes)))
+    item_ids = {barcode: item_id for barcode, item_id in result.all()}
+
+    location_ids = {entry.location_id for entry in entries}
+    result = await db.execute(select(Location.id).where(Location.id.in_(location_ids)))
+    known_locations = set(result.scalars().all())
+
+    # 同じ行を1文の中で2回更新できないため、キーごとに増減を合算する
+    deltas = {}
+    for entry in entries:
+        item_id = item_ids.get(entry.barcode)
+        if item_id is None or entry.location_id not in known_locations:
+            continue
+        key = (item_id, entry.location_id)
+        deltas[key] = deltas.get(key, 0) + entry.delta
+
+    returning = (Stock.id, Stock.item_id, Stock.location_id, Stock.quantity)
+    rows = {}
+    await set_movement_reason(db, "scan")
+
+    household_id = get_household(db)
+    increments = [
+        {"household_id": household_id, "item_id": item_id, "location_id": location_id, "quantity": delta}
+        for (item_id, location_id), delta in deltas.items() if delta > 0
+    ]
+    if increments:
+        stmt = insert(Stock).values(increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Stock.household_id, Stock.item_id, Stock.location_id],
+            set_={
+                "quantity": Stock.quantity + stmt.excluded.quantity,
+                "version": Stock.version + 1,
+                "updated_at": func.now(),
+            },
+        ).returning(*returning)
+        result = await db.execute(stmt)
+        rows.update({(row.item_id, row.location_id): row for row in result.all()})
+
+    decrements = [
+        (item_id, location_id, delta)
+        for (item_id, location_id), delta in deltas.items() if delta < 0
+    ]
+    if decrements:
+        changes = values(
+            column("item_id", Integer), column("location_id", Integer), column("delta", Integer),
+            name="changes",
+        ).data(decrements)
+        stmt = (
+            update(Stock)
+            .where(
+                Stock.item_id == changes.c.item_id,
+                Stock.location_id == changes.c.location_id,
+                Stock.quantity + changes.c.delta >= 0,
+            )
+            .values(
+                quantity=Stock.quantity + changes.c.delta,
+                version=Stock.version + 1,
+                updated_at=func.now(),
+            )
+            .returning(*returning)
+        )
+        result = await db.execute(stmt)
+        rows.update({(row.item_id, row.location_id): row for row in result.all()})
+
+    # 更新されなかった出庫のうち、在庫行があるものは在庫不足（現在の数量を返す）
+    shortfalls = {}
+    missed = [(item_id, location_id) for item_id, location_id, _ in decrements if (item_id, location_id) not in rows]
+    if missed:
+        result = await db.execute(
+            select(*returning).where(tuple_(Stock.item_id, Stock.location_id).in_(missed))
+        )
+        shortfalls = {(row.item_id, row.location_id): row for row in result.all()}
+
+    await db.commit()
+
+    results = []
+    for index, entry in enumerate(entries):
+        item_id = item_ids.get(entry.barcode)
+        key = (item_id, entry.location_id)
+        row = rows.get(key)
+        if item_id is None:
+            status = "unknown_barcode"
+        elif entry.location_id not in known_locations:
+            status = "unknown_location"
+        elif deltas[key] == 0:
+            # 同じ場所への増減が打ち消し合った（または delta が0の）ため何もしていない
+            status = "no_change"
+        elif key in shortfalls:
+            row = shortfalls[key]
+            status = "insufficient_stock"
+        elif row is None:
+            # 在庫行が無い場所からの出庫
+            status = "no_stock"
+        else:
+            status = "applied"
+        results.append(StockBatchResult(
+            index=index,
+            barcode=entry.barcode,
+            location_id=entry.location_id,
+            delta=entry.delta,
+            status=status,
+            stock_id=row.id if row is not None else None,
+            quantity=row.quantity if row is not None else None,
+        ))
+    return results
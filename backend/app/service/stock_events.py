@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+import asyncpg
+
+from app.db.database import DATABASE_URL
+from app.db.tenancy import DEFAULT_HOUSEHOLD_ID
+
+logger = logging.getLogger(__name__)
+
+# stocks のトリガーが通知するチャンネル
+CHANNEL = "stock_changes"
+# 購読者ごとに溜められるイベント数（超えた場合は再取得を促す RESYNC に置き換える）
+SUBSCRIBER_QUEUE_SIZE = 256
+# LISTEN 接続が切れたときの再接続間隔（秒）
+RECONNECT_DELAY = 5
+
+RESYNC = {"op": "RESYNC"}
+
+class Subscriber:
+    """在庫変更イベントの購読者（自分の世帯のイベントだけを受け取り、ロケーション・カテゴリで絞り込める）"""
+
+    def __init__(
+        self,
+        household_id: int = DEFAULT_HOUSEHOLD_ID,
+        location_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+    ):
+        self.household_id = household_id
+        self.location_id = location_id
+        self.category_id = category_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        # RESYNC（LISTEN の再接続）は世帯を持たないため全員に配信する
+        if event["op"] == "RESYNC":
+            return True
+        if event.get("household_id") != self.household_id:
+            return False
+        if event["op"] == "BULK":
+            return True
+        if self.location_id is not None and event.get("location_id") != self.location_id:
+            return False
+        if self.category_id is not None and event.get("category_id") != self.category_id:
+            return False
+        return True
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """イベントを積む。遅いクライアントでキューが溢れた場合は溜まった分を捨てて RESYNC だけを残す"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+class StockEventBroker:
+    """
+    ワーカーごとに1本の LISTEN 接続で在庫変更通知を受け取り、購読者に配信する。
+    接続プールとは別の専用接続を使う。
+    """
+
+    def __init__(self, dsn: str = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)):
+        self.dsn = dsn
+        self.subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(
+        self,
+        household_id: int = DEFAULT_HOUSEHOLD_ID,
+        location_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+    ) -> Subscriber:
+        subscriber = Subscriber(household_id=household_id, location_id=location_id, category_id=category_id)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        for subscriber in list(self.subscribers):
+            if subscriber.matches(event):
+                subscriber.offer(event)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("invalid %s payload: %r", channel, payload)
+            return
+        self.publish(event)
+
+    async def _run(self) -> None:
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                if reconnecting:
+                    # 切断中の通知は失われるため、購読者に再取得を促す
+                    self.publish(RESYNC)
+                await closed.wait()
+                logger.warning("LISTEN connection closed, reconnecting")
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("LISTEN %s failed: %s", CHANNEL, e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            reconnecting = True
+            await asyncio.sleep(RECONNECT_DELAY)
+
+# ワーカープロセスで共有するブローカー（lifespan で開始・停止する）
+broker = StockEventBroker()
@@ -0,0 +1,142 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import func, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.stock_movement import StockMovement, StockSnapshot
+
+logger = logging.getLogger(__name__)
+
+# 先行して作成しておく月別パーティションの数
+PARTITION_MONTHS_AHEAD = 2
+# 集約する範囲の終わりを現在時刻からずらす秒数
+# created_at はトランザクション開始時刻（now()）なので、実行中のトランザクションの行が後からコミットされても取りこぼさないようにする
+COMPACT_SAFETY_SECONDS = int(os.getenv("STOCK_MOVEMENT_COMPACT_SAFETY_SECONDS", 300))
+
+# 実行中のトランザクションを待って集約を遅らせる上限の秒数。これより長く開いたままのトランザクションは待たない
+COMPACT_MAX_LAG_SECONDS = int(os.getenv("STOCK_MOVEMENT_COMPACT_MAX_LAG_SECONDS", 3600))
+
+# 安全マージン前の時刻と、このデータベースで実行中の他のクライアントのトランザクションのうち最も古い開始時刻の直前
+# （そのトランザクションが書く行の created_at は開始時刻になる。autovacuum などのバックグラウンド処理は含めない）
+SETTLED_AT_SQL = """
+SELECT now() - make_interval(secs => :safety_seconds),
+       (SELECT min(xact_start) - interval '1 microsecond' FROM pg_stat_activity
+        WHERE datname = current_database() AND backend_type = 'client backend'
+          AND xact_start IS NOT NULL AND pid <> pg_backend_pid()),
+       now() - make_interval(secs => :max_lag_seconds)
+"""
+
+# 前回のスナップショットに、その後の増減を足して新しいスナップショットを作る（全世帯をまとめて処理する）
+COMPACT_SQL = """
+INSERT INTO stock_snapshots (household_id, taken_at, item_id, location_id, quantity)
+SELECT coalesce(p.household_id, m.household_id), CAST(:upto AS timestamptz),
+       coalesce(p.item_id, m.item_id), coalesce(p.location_id, m.location_id),
+       coalesce(p.quantity, 0) + coalesce(m.delta, 0)
+FROM (
+    SELECT household_id, item_id, location_id, quantity FROM stock_snapshots WHERE taken_at = :prev
+) p
+FULL OUTER JOIN (
+    SELECT household_id, item_id, location_id, sum(delta) AS delta FROM stock_movements
+    WHERE created_at > :prev AND created_at <= :upto
+    GROUP BY household_id, item_id, location_id
+) m ON p.household_id = m.household_id AND p.item_id = m.item_id AND coalesce(p.location_id, 0) = coalesce(m.location_id, 0)
+WHERE coalesce(p.quantity, 0) + coalesce(m.delta, 0) <> 0
+"""
+
+async def set_movement_reason(db: AsyncSession, reason: str) -> None:
+    """このトランザクションで記録される在庫履歴の理由を設定する（トリガーが参照する）"""
+    await db.execute(
+        select(func.set_config("app.stock_movement_reason", reason, True))
+    )
+
+async def get_settled_at(db: AsyncSession, safety_seconds: float, max_lag_seconds: float) -> datetime:
+    """
+    まだコミットされていない行が入り得ない時刻（これ以前の時刻の行は、もう増えない）を返す。
+    実行中のトランザクションに合わせて戻すのは max_lag_seconds 前までとし、戻したときはログに残す。
+    """
+    target, oldest, floor = (await db.execute(
+        text(SETTLED_AT_SQL), {"safety_seconds": safety_seconds, "max_lag_seconds": max_lag_seconds}
+    )).one()
+    if oldest is None or oldest >= target:
+        return target
+    if oldest < floor:
+        logger.warning(
+            "settled time clamped to %s: a transaction open since %s exceeds the max lag of %ss",
+            floor.isoformat(), oldest.isoformat(), max_lag_seconds,
+        )
+        return floor
+    logger.warning("settled time held back to %s by an open transaction (target %s)", oldest.isoformat(), target.isoformat())
+    return oldest
+
+async def _latest_snapshot_at(db: AsyncSession, at: datetime) -> Optional[datetime]:
+    result = await db.execute(select(func.max(StockSnapshot.taken_at)).where(StockSnapshot.taken_at <= at))
+    return result.scalar_one()
+
+# 履歴の集約（スナップショット作成）
+async def compact_stock_movements(db: AsyncSession, upto: Optional[datetime] = None) -> int:
+    """
+    upto 時点の在庫数スナップショットを作成し、作成した行数を返す。
+    upto は、まだコミットされていない履歴が入り得ない時刻（get_settled_at）までに切り詰める。
+    あわせて今後の月別パーティションを作成しておく。
+    """
+    settled = await get_settled_at(db, float(COMPACT_SAFETY_SECONDS), float(COMPACT_MAX_LAG_SECONDS))
+    upto = min(upto, settled) if upto is not None else settled
+    await db.execute(select(func.ensure_stock_movement_partitions(PARTITION_MONTHS_AHEAD)))
+
+    prev = await _latest_snapshot_at(db, upto)
+    if prev is not None and prev >= upto:
+        await db.commit()
+        return 0
+    prev = prev or datetime.min.replace(tzinfo=timezone.utc)
+
+    result = await db.execute(text(COMPACT_SQL), {"prev": prev, "upto": upto})
+    await db.commit()
+    return result.rowcount
+
+# ある時点の在庫数
+async def get_item_stock_at(db: AsyncSession, item_id: int, at: datetime) -> List:
+    """直近のスナップショット1つと、その後の増減だけを読んでロケーションごとの在庫数を求める"""
+    prev = await _latest_snapshot_at(db, at)
+
+    movements = select(
+        StockMovement.location_id, StockMovement.delta.label("quantity")
+    ).where(StockMovement.item_id == item_id, StockMovement.created_at <= at)
+    if prev is None:
+        parts = movements
+    else:
+        snapshot = select(StockSnapshot.location_id, StockSnapshot.quantity).where(
+            StockSnapshot.item_id == item_id, StockSnapshot.taken_at == prev
+        )
+        parts = union_all(snapshot, movements.where(StockMovement.created_at > prev))
+
+    parts = parts.subquery()
+    quantity = func.sum(parts.c.quantity)
+    query = (
+        select(parts.c.location_id, quantity.label("quantity"))
+        .group_by(parts.c.location_id)
+        .having(quantity != 0)
+        .order_by(parts.c.location_id)
+    )
+    result = await db.execute(query)
+    return result.all()
+
+# アイテムの在庫履歴
+async def get_item_movements(
+    db: AsyncSession,
+    item_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+) -> List[StockMovement]:
+    """アイテムの在庫履歴を新しい順に取得する（期間指定で対象パーティションだけを読む）"""
+    query = select(StockMovement).where(StockMovement.item_id == item_id)
+    if since is not None:
+        query = query.where(StockMovement.created_at >= since)
+    if until is not None:
+        query = query.where(StockMovement.created_at < until)
+    query = query.order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.category import Category
+from app.models.item import Item
+from app.models.location import Location
+from app.models.stock import Stock
+from app.models.sync_tombstone import SyncTombstone
+from app.schemas.category import Category as CategorySchema
+from app.schemas.item import Item as ItemSchema
+from app.schemas.location import Location as LocationSchema
+from app.schemas.stock import Stock as StockSchema
+from app.service.fast_read import columns_for
+
+# 同期対象のテーブル（レスポンスのキー, モデル, スキーマ）
+SYNC_TABLES = [
+    ("categories", Category, CategorySchema),
+    ("items", Item, ItemSchema),
+    ("locations", Location, LocationSchema),
+    ("stocks", Stock, StockSchema),
+]
+
+# 実行中のトランザクションが後からコミットする変更を取りこぼさないよう、watermark を少し戻す
+SYNC_SAFETY_SECONDS = int(os.getenv("SYNC_SAFETY_SECONDS", 5))
+# 削除記録の保持期間。これより古い watermark は全件同期にする
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+async def get_changes(db: AsyncSession, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    since 以降に追加・更新された行と削除された行のIDを返す。
+    since が無い、または削除記録の保持期間より古い場合は全件を返す（full=True）。
+    """
+    if since is not None and since.tzinfo is None:
+        # タイムゾーン無しの since は UTC とみなす
+        since = since.replace(tzinfo=timezone.utc)
+    server_now = (await db.execute(select(func.now()))).scalar_one()
+    watermark = server_now - timedelta(seconds=SYNC_SAFETY_SECONDS)
+    full = since is None or since < server_now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    changes: Dict[str, Any] = {"watermark": watermark, "full": full}
+    for key, model, schema in SYNC_TABLES:
+        query = select(*columns_for(model, schema))
+        if not full:
+            query = query.where(model.updated_at > since)
+        result = await db.execute(query.order_by(model.id))
+        changes[key] = result.all()
+
+    deleted: Dict[str, list] = {key: [] for key, _, _ in SYNC_TABLES}
+    if not full:
+        result = await db.execute(
+            select(SyncTombstone.table_name, SyncTombstone.row_id)
+            .where(SyncTombstone.deleted_at > since)
+            .order_by(SyncTombstone.id)
+        )
+        for table_name, row_id in result.all():
+            deleted.setdefault(table_name, []).append(row_id)
+    changes["deleted"] = deleted
+    return changes
+
+async def prune_tombstones(db: AsyncSession) -> int:
+    """保持期間を過ぎた削除記録を削除する"""
+    result = await db.execute(
+        delete(SyncTombstone).where(
+            SyncTombstone.deleted_at < func.now() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+        )
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,246 @@
+# docker compose exec backend python -m scripts.benchmark --requests 500 --concurrency 10
+# docker compose exec backend python -m scripts.benchmark --compare bench_results/<前回の結果>.json
+# APIをプロセス内（ASGI）で呼び出し、エンドポイントごとのレイテンシとスループットを計測する
+# 事前に scripts.generate_data でデータを投入しておくこと
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+from app.main import app
+from app.auth import issue_token
+from app.db.tenancy import DEFAULT_HOUSEHOLD_ID
+from app.service import fast_read
+from scripts.generate_data import barcode_for
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "..", "bench_results")
+# すべてのリクエストに付けるヘッダー（アクセストークンは main() で発行する）
+REQUEST_HEADERS = []
+
+class CursorPages:
+    """
+    返ってきた next_cursor を辿って一覧を先頭から順にめくる（最後のページの次は先頭に戻る）。
+    ワーカーごとに作るため、各ワーカーは requests / concurrency ページ目まで進む。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.cursor = ""
+
+    def __call__(self, rng):
+        return ("GET", f"{self.path}&cursor={quote(self.cursor)}", None)
+
+    def observe(self, status: int, body: bytes) -> None:
+        next_cursor = None
+        if status == 200:
+            try:
+                next_cursor = json.loads(body).get("next_cursor")
+            except (ValueError, AttributeError):
+                pass
+        self.cursor = next_cursor or ""
+
+def build_scenarios(items: int, stocks: int):
+    """計測するリクエスト（名前, リクエストを作る関数の生成関数）。リクエストを作る関数はメソッド, パス, ボディを返す"""
+    def get(path_fn):
+        def make_request(rng):
+            return ("GET", path_fn(rng), None)
+        return lambda: make_request
+
+    def pages(path):
+        return lambda: CursorPages(path)
+
+    return {
+        "health": get(lambda rng: "/v1/health"),
+        "items_offset": get(lambda rng: f"/v1/items/?skip={rng.randint(0, max(items - 25, 0))}&limit=25"),
+        "items_cursor": pages("/v1/items/?limit=25"),
+        "stocks_offset": get(lambda rng: f"/v1/stocks/?skip={rng.randint(0, max(stocks - 25, 0))}&limit=25"),
+        "stocks_cursor": pages("/v1/stocks/?limit=25"),
+        "stocks_view": get(lambda rng: "/v1/stocks/view?limit=100&sort=quantity&order=desc"),
+        "stocks_view_keyword": get(lambda rng: "/v1/stocks/view?keyword=洗剤&limit=100"),
+        "items_search": get(lambda rng: "/v1/items/search?q=シャンプ&limit=20"),
+        "items_low_stock": get(lambda rng: "/v1/items/low-stock?limit=100"),
+        "items_by_barcode": get(lambda rng: f"/v1/items/by-barcode/{barcode_for(rng.randint(1, items))}"),
+        "categories": get(lambda rng: "/v1/categories/"),
+        "locations": get(lambda rng: "/v1/locations"),
+    }
+
+async def asgi_request(method: str, path: str, body=None):
+    """ASGIアプリを直接呼び出し、ステータスコードとレスポンスボディを返す"""
+    url = urlsplit(path)
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    headers = list(REQUEST_HEADERS)
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode("utf-8"),
+        "query_string": url.query.encode("utf-8"),
+        "root_path": "",
+        "headers": headers,
+        "server": ("benchmark", 80),
+        "client": ("benchmark", 0),
+    }
+    status = {"code": 0}
+    chunks = []
+    received = {"done": False}
+
+    async def receive():
+        if received["done"]:
+            await asyncio.sleep(3600)
+        received["done"] = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status["code"], b"".join(chunks)
+
+def percentile(sorted_values, p: float) -> float:
+    """最近接順位法によるパーセンタイル"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+async def send_request(make_request, rng):
+    """リクエストを送り、レスポンスを見て次のリクエストを決めるシナリオ（CursorPages）には結果を渡す"""
+    status, body = await asgi_request(*make_request(rng))
+    observe = getattr(make_request, "observe", None)
+    if observe is not None:
+        observe(status, body)
+    return status
+
+async def run_scenario(new_request_maker, requests: int, concurrency: int, warmup: int, seed: int):
+    rng = random.Random(seed)
+    make_request = new_request_maker()
+    for _ in range(warmup):
+        await send_request(make_request, rng)
+
+    remaining = requests
+    latencies = []
+    errors = 0
+
+    async def worker(index: int):
+        nonlocal errors, remaining
+        worker_rng = random.Random(seed + index)
+        make_request = new_request_maker()
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            status = await send_request(make_request, worker_rng)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results, baseline_path: str, threshold: float) -> bool:
+    """前回の結果と比較し、p95 が threshold（%）以上悪化したシナリオがあれば False を返す"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["scenarios"]
+    ok = True
+    print(f"\n比較対象: {baseline_path}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        regressed = change >= threshold
+        ok = ok and not regressed
+        mark = "❌" if regressed else "  "
+        print(f"{mark} {name:<22} p95 {before['p95_ms']:>9.2f} -> {current['p95_ms']:>9.2f} ms ({change:+.1f}%)")
+    return ok
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="APIのベンチマークを実行する")
+    parser.add_argument("--requests", type=int, default=200, help="シナリオごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--items", type=int, default=100000, help="投入済みのアイテム数（generate_data と合わせる）")
+    parser.add_argument("--stocks", type=int, default=500000, help="投入済みの在庫数（generate_data と合わせる）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--household", type=int, default=DEFAULT_HOUSEHOLD_ID, help="計測する世帯ID（アクセストークンを発行する）")
+    parser.add_argument("--only", nargs="*", help="実行するシナリオ名")
+    parser.add_argument("--read-path", choices=["fast", "orm"], default="fast", help="一覧系エンドポイントの取得方法")
+    parser.add_argument("--output", help="結果のJSONの出力先（省略時は bench_results/ 以下）")
+    parser.add_argument("--compare", help="比較する前回の結果JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="悪化とみなす p95 の増加率（%%）")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    fast_read.FAST_READ_PATH = args.read_path == "fast"
+    REQUEST_HEADERS.append((b"authorization", f"Bearer {issue_token(args.household)}".encode()))
+    scenarios = build_scenarios(args.items, args.stocks)
+    names = args.only or list(scenarios)
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        for name in names:
+            results[name] = await run_scenario(
+                scenarios[name], args.requests, args.concurrency, args.warmup, args.seed
+            )
+            r = results[name]
+            print(
+                f"{name:<22} {r['throughput_rps']:>8.1f} req/s  p50 {r['p50_ms']:>8.2f}  "
+                f"p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  errors {r['errors']}"
+            )
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "scenarios": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存しました: {output}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
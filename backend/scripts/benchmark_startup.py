@@ -0,0 +1,149 @@
+# docker compose exec backend python -m scripts.benchmark_startup --runs 5
+# docker compose exec backend python -m scripts.benchmark_startup --no-db --import-budget-ms 1000 --first-response-budget-ms 2000
+# コールドスタートの時間を計測する（毎回新しいプロセスで起動する）
+#   import: app.main のインポート、create_app()、OpenAPIスキーマの生成にかかる時間
+#   first_response: uvicorn を起動してから最初のレスポンス（/v1/health）が返るまでの時間
+# 予算（ミリ秒）を超えた場合は終了コード 1 で終わるため、CI で起動時間の悪化を検出できる
+
+import sys
+import os
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "bench_results")
+
+# 子プロセスで実行する計測コード（結果をJSONで標準出力に書く）
+IMPORT_PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+application = app.main.create_app()
+created = time.perf_counter()
+application.openapi()
+finished = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "openapi_ms": (finished - created) * 1000,
+    "total_ms": (created - started) * 1000,
+}))
+"""
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_import(env) -> dict:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure_first_response(env, path: str, timeout: float) -> float:
+    """uvicorn を起動し、path が 200 を返すまでの時間（ミリ秒）を返す"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"no response from {url} within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def summarize(values) -> dict:
+    return {
+        "median_ms": round(statistics.median(values), 1),
+        "min_ms": round(min(values), 1),
+        "max_ms": round(max(values), 1),
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="アプリの起動時間を計測する")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数（中央値で判定する）")
+    parser.add_argument("--path", default="/v1/health", help="最初のレスポンスを待つパス")
+    parser.add_argument("--timeout", type=float, default=60.0, help="起動を待つ最大秒数")
+    parser.add_argument("--no-db", action="store_true", help="DBに接続しない（プールの事前確立とスケジューラを無効にする）")
+    parser.add_argument("--import-budget-ms", type=float, help="インポート + create_app() の中央値の上限")
+    parser.add_argument("--first-response-budget-ms", type=float, help="最初のレスポンスまでの中央値の上限")
+    parser.add_argument("--output", help="結果のJSONの出力先（省略時は bench_results/ 以下）")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    env = dict(os.environ)
+    if args.no_db:
+        env.update({"DB_WARM_UP": "false", "SCHEDULER_ENABLED": "false"})
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    first_responses = [measure_first_response(env, args.path, args.timeout) for _ in range(args.runs)]
+
+    results = {
+        key: summarize([run[key] for run in imports])
+        for key in ("import_ms", "create_app_ms", "openapi_ms", "total_ms")
+    }
+    results["first_response_ms"] = summarize(first_responses)
+    for name, r in results.items():
+        print(f"{name:<20} median {r['median_ms']:>8.1f}  min {r['min_ms']:>8.1f}  max {r['max_ms']:>8.1f} ms")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "startup": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存しました: {output}")
+
+    ok = True
+    budgets = [
+        ("total_ms", args.import_budget_ms),
+        ("first_response_ms", args.first_response_budget_ms),
+    ]
+    for name, budget in budgets:
+        if budget is not None and results[name]["median_ms"] > budget:
+            print(f"❌ {name} {results[name]['median_ms']:.1f} ms > 予算 {budget:.1f} ms")
+            ok = False
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+# docker compose exec backend python -m scripts.compact_movements
+# 在庫履歴からスナップショットを作成し、今後の月別パーティションを用意する
+# 定期実行（例: 毎日）を想定
+
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+from app.db.session import SessionLocal
+from app.service.stock_movement import compact_stock_movements
+
+async def main():
+    async with SessionLocal() as db:
+        rows = await compact_stock_movements(db)
+    print(f"✅ スナップショットを作成しました（{rows} 行）")
+
+if __name__ == "__main__":
+    asyncio.run(main())
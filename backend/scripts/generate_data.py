@@ -0,0 +1,139 @@
+# docker compose exec backend python -m scripts.generate_data --items 1000000 --stocks 5000000 --locations 100
+# ベンチマーク用の合成データを既定の世帯に投入する（既存データは全世帯分削除される）
+# 同じ引数・シードなら常に同じデータになる
+
+import sys
+import os
+import argparse
+import asyncio
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.db.tenancy import DEFAULT_HOUSEHOLD_ID
+
+# COPY 1回あたりの行数
+CHUNK_SIZE = 50000
+
+ITEM_PREFIXES = ["徳用", "国産", "無添加", "詰め替え", "大容量", "低刺激", "お徳用", "業務用", "天然", "プレミアム"]
+ITEM_NOUNS = [
+    "トイレットペーパー", "ティッシュ", "洗剤", "シャンプー", "歯ブラシ", "お米", "醤油", "味噌",
+    "パスタ", "コーヒー", "緑茶", "乾電池", "ゴミ袋", "ラップ", "キッチンペーパー", "石鹸",
+]
+
+def barcode_for(item_id: int) -> str:
+    """アイテムIDから決まる13桁のバーコード（ベンチマークでも使う）"""
+    return f"{4900000000000 + item_id:013d}"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="合成データを投入する")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--locations", type=int, default=100)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--stocks", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def iter_item_records(count: int, categories: int, rng: random.Random):
+    for item_id in range(1, count + 1):
+        name = f"{rng.choice(ITEM_PREFIXES)}{rng.choice(ITEM_NOUNS)} {item_id}"
+        yield (item_id, barcode_for(item_id), name, rng.randint(1, categories), rng.randint(1, 5))
+
+def iter_stock_records(count: int, items: int, locations: int, rng: random.Random):
+    # アイテムごとに異なるロケーションへ割り当て、(item_id, location_id) の重複を避ける
+    for stock_id in range(1, count + 1):
+        item_id = (stock_id - 1) % items + 1
+        location_id = ((stock_id - 1) // items + item_id) % locations + 1
+        yield (stock_id, item_id, location_id, rng.randint(0, 20))
+
+def with_household(records, household_id: int = DEFAULT_HOUSEHOLD_ID):
+    for record in records:
+        yield (household_id, *record)
+
+def chunked(records, size: int = CHUNK_SIZE):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def copy_records(driver_connection, table: str, columns, records) -> int:
+    rows = 0
+    for chunk in chunked(records):
+        await driver_connection.copy_records_to_table(table, records=chunk, columns=columns)
+        rows += len(chunk)
+    return rows
+
+async def generate(args):
+    if args.stocks > args.items * args.locations:
+        raise SystemExit("--stocks must be <= --items * --locations")
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    async with SessionLocal() as db:
+        await db.execute(text(
+            "TRUNCATE stock_movements, stock_snapshots, sync_tombstones, item_forecasts, item_stock_totals, "
+            "stocks, items, categories, locations "
+            "RESTART IDENTITY CASCADE"
+        ))
+        # 行ごとのトリガーは投入後に集合演算でまとめて反映する
+        await db.execute(text("ALTER TABLE items DISABLE TRIGGER USER"))
+        await db.execute(text("ALTER TABLE stocks DISABLE TRIGGER USER"))
+
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        counts = {}
+        counts["categories"] = await copy_records(
+            driver_connection, "categories", ["household_id", "id", "name"],
+            with_household((i, f"カテゴリ{i}") for i in range(1, args.categories + 1)),
+        )
+        counts["locations"] = await copy_records(
+            driver_connection, "locations", ["household_id", "id", "name"],
+            with_household((i, f"ロケーション{i}") for i in range(1, args.locations + 1)),
+        )
+        counts["items"] = await copy_records(
+            driver_connection, "items", ["household_id", "id", "barcode", "name", "category_id", "min_threshold"],
+            with_household(iter_item_records(args.items, args.categories, rng)),
+        )
+        counts["stocks"] = await copy_records(
+            driver_connection, "stocks", ["household_id", "id", "item_id", "location_id", "quantity"],
+            with_household(iter_stock_records(args.stocks, args.items, args.locations, rng)),
+        )
+
+        await db.execute(text("ALTER TABLE items ENABLE TRIGGER USER"))
+        await db.execute(text("ALTER TABLE stocks ENABLE TRIGGER USER"))
+        await db.execute(text("""
+            INSERT INTO item_stock_totals (household_id, item_id, total, min_threshold)
+            SELECT i.household_id, i.id, coalesce(sum(s.quantity), 0), i.min_threshold
+            FROM items i LEFT JOIN stocks s ON s.household_id = i.household_id AND s.item_id = i.id
+            GROUP BY i.household_id, i.id
+        """))
+        await db.execute(text("""
+            INSERT INTO stock_snapshots (household_id, taken_at, item_id, location_id, quantity)
+            SELECT household_id, now(), item_id, location_id, quantity FROM stocks WHERE quantity <> 0
+        """))
+        for table in ("categories", "locations", "items", "stocks"):
+            await db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"))
+        await db.commit()
+
+        for table in ("categories", "locations", "items", "stocks", "item_stock_totals"):
+            await db.execute(text(f"ANALYZE {table}"))
+        await db.commit()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"✅ 合成データを投入しました（{elapsed:.1f} 秒 / {total / elapsed:,.0f} 行/秒）")
+    print("   " + ", ".join(f"{table}: {count:,}" for table, count in counts.items()))
+
+if __name__ == "__main__":
+    asyncio.run(generate(parse_args()))
@@ -0,0 +1,54 @@
+# docker compose exec backend python -m scripts.import_data /path/to/inventory.csv
+# CSV（ヘッダー付き）またはNDJSONの在庫データを一括でインポートする
+# 列: barcode, item_name, category_name, location_name, quantity, min_threshold
+
+import sys
+import os
+import argparse
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+from app.db.session import SessionLocal
+from app.db.tenancy import DEFAULT_HOUSEHOLD_ID, set_household
+from app.service.importer import IMPORT_BATCH_SIZE, import_inventory
+
+# ファイルを読み進める単位（バイト）
+READ_CHUNK_SIZE = 1024 * 1024
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="在庫データを一括インポートする")
+    parser.add_argument("path", help="CSV または NDJSON ファイルのパス")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="省略時は拡張子から判定")
+    parser.add_argument("--household", type=int, default=DEFAULT_HOUSEHOLD_ID, help="取り込み先の世帯ID")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="COPY 1回あたりの行数")
+    return parser.parse_args()
+
+async def read_chunks(path: str):
+    """ファイルを先頭から READ_CHUNK_SIZE ずつ返す"""
+    with open(path, "rb") as source:
+        while True:
+            chunk = source.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+async def main():
+    args = parse_args()
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    async with SessionLocal() as db:
+        set_household(db, args.household)
+        report = await import_inventory(db, read_chunks(args.path), fmt=fmt, batch_size=args.batch_size)
+
+    print(
+        f"✅ {report.rows} 行をインポートしました"
+        f"（スキップ {report.skipped} 行 / {report.elapsed_seconds} 秒 / {report.rows_per_second} 行/秒）"
+    )
+    print(
+        f"   categories: {report.categories}, items: {report.items}, "
+        f"locations: {report.locations}, stocks: {report.stocks}"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,6 +16,7 @@ from sqlalchemy import delete
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
 
 from app.db.session import SessionLocal
+from app.db.tenancy import DEFAULT_HOUSEHOLD_ID, set_household
 from app.models.location import Location
 from app.models.category import Category
 from app.models.item import Item
@@ -23,6 +24,8 @@ from app.models.stock import Stock
 
 async def init():
     async with SessionLocal() as db:
+        # 既定の世帯のデータだけを作り直す
+        set_household(db, DEFAULT_HOUSEHOLD_ID)
         await db.execute(delete(Stock))
         await db.execute(delete(Item))
         await db.execute(delete(Category))
@@ -0,0 +1,27 @@
+# docker compose exec backend python -m scripts.issue_token --household 1 --days 30
+# 世帯のアクセストークンを発行する（API には Authorization: Bearer <トークン> で渡す）
+# 署名には AUTH_SECRET を使うため、API サーバーと同じ値を設定して実行すること
+
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+from dotenv import load_dotenv
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="世帯のアクセストークンを発行する")
+    parser.add_argument("--household", type=int, required=True, help="トークンで操作できる世帯ID")
+    parser.add_argument("--days", type=float, default=30, help="有効期間（日）")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    load_dotenv()
+    from app.auth import issue_token
+
+    print(issue_token(args.household, ttl_seconds=int(args.days * 86400)))
+
+if __name__ == "__main__":
+    main()
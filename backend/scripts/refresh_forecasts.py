@@ -0,0 +1,22 @@
+# docker compose exec backend python -m scripts.refresh_forecasts
+# 在庫履歴から全アイテムの消費ペースと在庫切れ予測を作り直す
+# 定期実行（例: 毎日）を想定
+
+import sys
+import os
+import asyncio
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+from app.db.session import SessionLocal
+from app.service.forecast import refresh_forecasts
+
+async def main():
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        count = await refresh_forecasts(db)
+    print(f"✅ 在庫切れ予測を作成しました（{count} 件 / {time.perf_counter() - started:.1f} 秒）")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+# docker compose exec -e TEST_DATABASE_URL=postgresql+asyncpg://postgres:postgres@db:5432/inventory_test backend python -m pytest tests
+# （pytest は requirements-dev.txt に含まれる）
+# DBを使うテストは、マイグレーションを適用した専用のデータベースで実行する（テーブルの中身は消される）
+# TEST_DATABASE_URL が未設定の場合、DBを使うテストはスキップする
+
+import os
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # app.db.database はインポート時に接続先を読むため、アプリのインポートより先に設定する
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.pop("DATABASE_READ_URL", None)
+    os.environ["DB_WARM_UP"] = "false"
+    os.environ.setdefault("AUTH_SECRET", "test-secret")
+
+@pytest.fixture(scope="session")
+def database() -> str:
+    """テスト用データベースにマイグレーションを適用する"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+    return TEST_DATABASE_URL
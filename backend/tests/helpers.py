@@ -0,0 +1,61 @@
+import json
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from sqlalchemy import event
+
+async def asgi_get(app, path: str, headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """ASGIアプリに GET を送り、ステータス・ヘッダー・ボディを返す"""
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode("utf-8"),
+        "query_string": url.query.encode("utf-8"),
+        "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        "server": ("test", 80),
+        "client": ("test", 0),
+    }
+    response = {"status": 0, "headers": {}, "body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {key.decode(): value.decode() for key, value in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+def auth_headers(household_id: int = 1) -> Dict[str, str]:
+    """世帯のアクセストークンを付けたヘッダー"""
+    from app.auth import issue_token
+
+    return {"Authorization": f"Bearer {issue_token(household_id)}"}
+
+def json_body(body: bytes):
+    return json.loads(body.decode("utf-8"))
+
+@contextmanager
+def count_queries(engine):
+    """ブロック内でエンジンが実行したSQLを記録する（before_cursor_execute）"""
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from tests.helpers import asgi_get, auth_headers, count_queries, json_body
+
+# conditional_get がETag用に版数を読むクエリ
+ETAG_QUERIES = 1
+
+# (アイテム数, ロケーション数, カテゴリ数)。件数が変わってもクエリ数が変わらないことを確かめる
+SIZES = [(3, 2, 2), (40, 4, 5)]
+
+async def _seed(items: int, locations: int, categories: int) -> None:
+    """カテゴリ・ロケーション・アイテムと、全アイテム×全ロケーションの在庫を入れ直す"""
+    from app.db.database import AsyncSessionLocal
+    from app.models import Category, Item, Location, Stock
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("TRUNCATE categories, locations, items, stocks CASCADE"))
+        category_rows = [Category(name=f"category-{n}") for n in range(categories)]
+        location_rows = [Location(name=f"location-{n}") for n in range(locations)]
+        db.add_all(category_rows + location_rows)
+        await db.flush()
+        item_rows = [
+            Item(barcode=f"{n:013d}", name=f"item-{n}", category_id=category_rows[n % categories].id, min_threshold=1)
+            for n in range(items)
+        ]
+        db.add_all(item_rows)
+        await db.flush()
+        db.add_all([
+            Stock(item_id=item.id, location_id=location.id, quantity=1)
+            for item in item_rows for location in location_rows
+        ])
+        await db.commit()
+
+async def _count(path: str, size):
+    """データを入れて path を取得し、(レスポンス, 実行されたSQL) を返す"""
+    from app.db.database import ENGINES, dispose_engines
+    from app.main import app
+
+    headers = auth_headers()
+    try:
+        # 接続時の初期化クエリを数えないよう、1回目のリクエストは捨てる
+        await asgi_get(app, path, headers)
+        await _seed(*size)
+        with count_queries(ENGINES["read"]) as statements:
+            status, _, body = await asgi_get(app, path, headers)
+    finally:
+        # テストごとにイベントループが変わるため、コネクションを持ち越さない
+        await dispose_engines()
+    assert status == 200
+    return json_body(body), statements
+
+@pytest.mark.parametrize("size", SIZES)
+def test_items_include_category_and_stock_locations(database, size):
+    items, locations, _ = size
+    body, statements = asyncio.run(_count("/v1/items/?limit=1000&include=category,stocks.location", size))
+    assert len(body) == items
+    assert all(item["category"] is not None for item in body)
+    assert all(len(item["stocks"]) == locations and item["stocks"][0]["location"] for item in body)
+    # items + category（joinedload）と stocks + location（selectinload）
+    assert len(statements) == 2 + ETAG_QUERIES, statements
+
+@pytest.mark.parametrize("size", SIZES)
+def test_stocks_include_item_category_and_location(database, size):
+    items, locations, _ = size
+    body, statements = asyncio.run(_count("/v1/stocks/?limit=1000&include=item.category,location", size))
+    assert len(body) == items * locations
+    assert all(stock["item"]["category"] is not None and stock["location"] for stock in body)
+    # 多対一はすべて joinedload なので1回
+    assert len(statements) == 1 + ETAG_QUERIES, statements
+
+@pytest.mark.parametrize("size", SIZES)
+def test_locations_include_stock_items_and_categories(database, size):
+    items, locations, _ = size
+    body, statements = asyncio.run(_count("/v1/locations?include=stocks.item.category", size))
+    assert len(body) == locations
+    assert all(len(location["stocks"]) == items for location in body)
+    assert all(stock["item"]["category"] is not None for location in body for stock in location["stocks"])
+    # locations と stocks + item + category（selectinload の中で joinedload）
+    assert len(statements) == 2 + ETAG_QUERIES, statements
@@ -0,0 +1,54 @@
+import asyncio
+import csv
+
+import pytest
+
+from app.service.importer import _iter_records
+
+CSV = (
+    "﻿barcode,item_name,category_name,location_name,quantity,min_threshold\r\n"
+    "4900000000001,\"Milk, 1L\",Dairy,Fridge,2,1\r\n"
+    "4900000000002,\"Two\r\nlines\",,Shelf,,\r\n"
+    "4900000000003,Eggs,Dairy,Fridge,10,"
+).encode()
+
+NDJSON = (
+    '{"barcode": "4900000000001", "item_name": "牛乳", "quantity": 2}\n'
+    "\n"
+    '{"barcode": "4900000000002", "location_name": "棚"}\n'
+).encode()
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def _records(data: bytes, fmt: str, size: int):
+    async def collect():
+        return [record async for record in _iter_records(_chunks(data, size), fmt)]
+    return asyncio.run(collect())
+
+# 1バイトずつ（マルチバイト文字・\r\n・引用符の途中で切れる）から一括まで
+@pytest.mark.parametrize("size", [1, 2, 7, len(CSV)])
+def test_csv_records_do_not_depend_on_chunk_boundaries(size):
+    assert _records(CSV, "csv", size) == [
+        (2, "4900000000001", "Milk, 1L", "Dairy", "Fridge", 2, 1),
+        (4, "4900000000002", "Two\r\nlines", None, "Shelf", None, None),
+        (5, "4900000000003", "Eggs", "Dairy", "Fridge", 10, None),
+    ]
+
+@pytest.mark.parametrize("size", [1, 5, len(NDJSON)])
+def test_ndjson_records_keep_line_numbers(size):
+    assert _records(NDJSON, "ndjson", size) == [
+        (1, "4900000000001", "牛乳", None, None, 2, None),
+        (3, "4900000000002", None, None, "棚", None, None),
+    ]
+
+@pytest.mark.parametrize("data, fmt, error", [
+    (b"barcode,quantity\n1,\xff\n", "csv", ValueError),
+    (b'barcode,item_name\n1,"' + b"x" * (csv.field_size_limit() + 1) + b'"\n', "csv", csv.Error),
+    (b"barcode,quantity\n1,many\n", "csv", ValueError),
+    (b'{"barcode": "1"}\n[1]\n', "ndjson", ValueError),
+])
+def test_invalid_input_raises(data, fmt, error):
+    with pytest.raises(error):
+        _records(data, fmt, 4096)
@@ -0,0 +1,57 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.auth import issue_token
+from app.db.tenancy import household_from_request
+
+SECRET = "test-secret"
+
+def _request(headers=None, query: str = "") -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/v1/items/",
+        "query_string": query.encode(),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+    })
+
+@pytest.fixture(autouse=True)
+def auth_secret(monkeypatch):
+    monkeypatch.setattr("app.auth.AUTH_SECRET", SECRET)
+
+def test_household_comes_from_the_signed_token():
+    token = issue_token(7)
+    assert household_from_request(_request({"Authorization": f"Bearer {token}"})) == 7
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"Authorization": "Bearer "},
+    {"Authorization": "Basic dXNlcjpwYXNz"},
+    # 以前の世帯指定ヘッダーだけでは世帯を選べない
+    {"X-Household-Id": "2"},
+])
+def test_requests_without_a_token_are_rejected(headers):
+    with pytest.raises(HTTPException) as raised:
+        household_from_request(_request(headers))
+    assert raised.value.status_code == 401
+
+def test_tampered_expired_and_foreign_tokens_are_rejected():
+    body = issue_token(1).split(".")[1]
+    forged = issue_token(2).split(".")
+    forged[1] = body
+    tokens = [
+        ".".join(forged),
+        issue_token(1, ttl_seconds=-1),
+        issue_token(1, secret="another-secret"),
+    ]
+    for token in tokens:
+        with pytest.raises(HTTPException) as raised:
+            household_from_request(_request({"Authorization": f"Bearer {token}"}))
+        assert raised.value.status_code == 401
+
+def test_query_token_is_accepted_only_when_allowed():
+    query = f"access_token={issue_token(3)}"
+    with pytest.raises(HTTPException):
+        household_from_request(_request(query=query))
+    assert household_from_request(_request(query=query), allow_query_token=True) == 3
@@ -1,4 +1,4 @@
-import { API_BASE_URL } from '$shared/utils/apiConfigUtils';
+import { API_BASE_URL, API_HEADERS } from '$shared/utils/apiConfigUtils';
 import type { Location } from '$features/floorViewer/model/types';
 import { handleApiError, safeApiCall } from '$shared/utils/apiErrorHandlerUtils';
 import { ErrorMessages } from '$shared/utils/errorMessageUtils';
@@ -11,7 +11,7 @@ export const load = async (): Promise<Location[]> => {
 	return safeApiCall(
 		async () => {
 			const url = `${API_BASE_URL}/locations`;
-			const response = await fetch(url);
+			const response = await fetch(url, { headers: API_HEADERS });
 
 			if (!response.ok) {
 				await handleApiError(response);
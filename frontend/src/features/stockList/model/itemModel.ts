@@ -1,6 +1,6 @@
 export interface Item {
 	id: number;
-	barcode: number | null;
+	barcode: string | null;
 	name: string;
 	category_id: number | null;
 	min_threshold: number;
@@ -1,4 +1,4 @@
-import { API_BASE_URL } from '$shared/utils/apiConfigUtils';
+import { API_BASE_URL, API_HEADERS } from '$shared/utils/apiConfigUtils';
 import { handleApiError, safeApiCall } from '$shared/utils/apiErrorHandlerUtils';
 import type { Category } from '$features/stockList/model/categoryModel';
 
@@ -10,7 +10,7 @@ export const load = async (): Promise<Category[]> => {
   return safeApiCall(
     async () => {
       const url = `${API_BASE_URL}/categories`;
-      const response = await fetch(url);
+      const response = await fetch(url, { headers: API_HEADERS });
 
       if (!response.ok) {
         await handleApiError(response);
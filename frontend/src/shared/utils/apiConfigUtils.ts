@@ -9,3 +9,8 @@ export const isProduction = import.meta.env.PUBLIC_ENV === 'production';
 export const API_BASE_URL = import.meta.env.DEV 
   ? 'http://localhost:8000/v1'
   : import.meta.env.PUBLIC_API_BASE_URL;
+
+// APIは世帯ごとのアクセストークン（backend の scripts/issue_token.py で発行）で認証する
+export const API_HEADERS: HeadersInit = import.meta.env.PUBLIC_API_TOKEN
+  ? { Authorization: `Bearer ${import.meta.env.PUBLIC_API_TOKEN}` }
+  : {};